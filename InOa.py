@@ -1,11 +1,31 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date
+import numpy as np
+from datetime import datetime, date, timedelta
 import json
+import os
+import hashlib
+import hmac
+import time
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 import base64
-from io import BytesIO
-import plotly.express as px
-import plotly.graph_objects as go
+import bisect
+import cProfile
+import functools
+import heapq
+import io
+import logging
+import pstats
+import random
+import secrets
+import tornado.web
+import zipfile
+
+logger = logging.getLogger(__name__)
 
 # Configure page
 st.set_page_config(
@@ -17,35 +37,294 @@ st.set_page_config(
 
 
 # PWA Configuration
-import streamlit as st
-def add_pwa_config():
-    st.markdown("""
-    <!-- Android / Chrome -->
-    <link rel="manifest" href="https://raw.githubusercontent.com/aswanigopinathmg-tech/Streamlit/main/manifest.json">
-
-    <!-- iOS / Safari -->
-  <link rel="apple-touch-icon" sizes="180x180" href="https://raw.githubusercontent.com/aswanigopinathmg-tech/Streamlit/main/ios-img-180.png">
-    <link rel="apple-touch-icon" sizes="152x152" href="https://raw.githubusercontent.com/aswanigopinathmg-tech/Streamlit/main/ios-img-152.png">
-    <link rel="apple-touch-icon" sizes="120x120" href="https://raw.githubusercontent.com/aswanigopinathmg-tech/Streamlit/main/ios-img-120.png">
-    """, unsafe_allow_html=True)
-
-# Call the function at the top of your Streamlit script
-add_pwa_config()
+PWA_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+PWA_ROUTE = 'pwa'
+PWA_FALLBACK_ROUTE = 'app/static'  # Streamlit's own static serving, see .streamlit/config.toml
+PWA_ASSET_MAX_AGE = 365 * 24 * 3600
+# Streamlit releases whose server internals install_pwa_routes was checked against
+PWA_ROUTES_STREAMLIT = '>=1.47,<1.48'
+PWA_HEAD_TAGS = [
+    # Android / Chrome
+    {'rel': 'manifest', 'file': 'manifest.json'},
+    # iOS / Safari
+    {'rel': 'apple-touch-icon', 'sizes': '180x180', 'file': 'ios-img-180.png'},
+    {'rel': 'apple-touch-icon', 'sizes': '152x152', 'file': 'ios-img-152.png'},
+    {'rel': 'apple-touch-icon', 'sizes': '120x120', 'file': 'ios-img-120.png'},
+]
+
+
+class PWAAssetHandler(tornado.web.StaticFileHandler):
+    """Serves static/ with year-long immutable caching for ?v= versioned URLs"""
+
+    def set_extra_headers(self, path):
+        if 'v' in self.request.arguments:
+            self.set_header('Cache-Control', f'public, max-age={PWA_ASSET_MAX_AGE}, immutable')
+        else:
+            self.set_header('Cache-Control', 'no-cache')
+
+
+class ServiceWorkerHandler(tornado.web.RequestHandler):
+    """Serves static/sw.js at the app root so it can control the whole app"""
+
+    def initialize(self, path):
+        self.path = path
+
+    def get(self):
+        with open(self.path, 'rb') as f:
+            body = f.read()
+        self.set_header('Content-Type', 'text/javascript; charset=utf-8')
+        # Browsers revalidate service workers themselves; never let a proxy pin an old one
+        self.set_header('Cache-Control', 'no-cache')
+        self.write(body)
+
+
+@st.cache_resource
+def install_pwa_routes():
+    """Add the PWA asset and service worker routes to the running server; False where that is unsupported"""
+    import gc
+    from packaging.specifiers import SpecifierSet
+    from tornado.routing import PathMatches, Rule
+    from streamlit import config
+
+    if st.__version__ not in SpecifierSet(PWA_ROUTES_STREAMLIT):
+        logger.warning("PWA routes are untested on Streamlit %s (checked: %s); the service worker is disabled",
+                       st.__version__, PWA_ROUTES_STREAMLIT)
+        return False
+    try:
+        from streamlit.web.server.server_util import make_url_path_regex
+
+        # type() rather than isinstance, which would touch __class__ on lazy proxies such as st.experimental_user
+        apps = [obj for obj in gc.get_objects() if issubclass(type(obj), tornado.web.Application)]
+        base = config.get_option('server.baseUrlPath')
+        rules = [
+            Rule(PathMatches(make_url_path_regex(base, 'sw.js')), ServiceWorkerHandler,
+                 {'path': os.path.join(PWA_STATIC_DIR, 'sw.js')}),
+            Rule(PathMatches(make_url_path_regex(base, rf'{PWA_ROUTE}/(.*)')), PWAAssetHandler,
+                 {'path': PWA_STATIC_DIR}),
+        ]
+        routers = [app.wildcard_router.rules for app in apps]
+        if not all(isinstance(router, list) for router in routers):
+            raise TypeError("tornado wildcard_router.rules is not a list")
+        for router in routers:
+            router[:0] = rules
+    except (ImportError, AttributeError, TypeError):
+        logger.exception("Could not add the PWA routes; the service worker is disabled")
+        return False
+    return bool(routers)
+
+
+@st.cache_resource
+def pwa_asset_versions():
+    """Content hash of each file in static/, used as its ?v= cache key"""
+    versions = {}
+    for name in sorted(os.listdir(PWA_STATIC_DIR)):
+        with open(os.path.join(PWA_STATIC_DIR, name), 'rb') as f:
+            versions[name] = hashlib.sha256(f.read()).hexdigest()[:12]
+    return versions
 
 
-# Custom CSS for responsive design
-st.markdown("""
-<script>
-const manifestUrl = "https://raw.githubusercontent.com/aswanigopinathmg-tech/Streamlit/main/manifest.json";
-const link = document.createElement('link');
-link.rel = 'manifest';
-link.href = manifestUrl;
-document.head.appendChild(link);
-</script>
-""", unsafe_allow_html=True)
+def add_pwa_config():
+    """Add the PWA link tags and service worker once per browser session"""
+    if st.session_state.get('pwa_head_injected'):
+        return
+    import streamlit.components.v1 as components
+
+    versions = pwa_asset_versions()
+    routed = install_pwa_routes()
+    route = PWA_ROUTE if routed else PWA_FALLBACK_ROUTE
+    tags = [dict({k: v for k, v in tag.items() if k != 'file'}, href=f"{route}/{tag['file']}?v={versions[tag['file']]}")
+            for tag in PWA_HEAD_TAGS]
+    # The service worker is versioned by all assets, so any change installs a fresh cache
+    worker_version = hashlib.sha256(json.dumps(versions, sort_keys=True).encode()).hexdigest()[:12]
+
+    components.html(f"""
+    <script>
+    const parent = window.parent;
+    const head = parent.document.head;
+    for (const attrs of {json.dumps(tags)}) {{
+        if (head.querySelector(`link[rel="${{attrs.rel}}"][href="${{attrs.href}}"]`)) continue;
+        const link = parent.document.createElement('link');
+        for (const [name, value] of Object.entries(attrs)) link.setAttribute(name, value);
+        head.appendChild(link);
+    }}
+    if ({json.dumps(routed)} && 'serviceWorker' in parent.navigator) {{
+        const scope = new URL('./', parent.location.href);
+        parent.navigator.serviceWorker.register(new URL('sw.js?v={worker_version}', scope), {{scope: scope.pathname}});
+    }}
+    </script>
+    """, height=0)
+    st.session_state.pwa_head_injected = True
+
+
+# Instrumentation, opt-in with LAB_PROFILE=1
+PROFILE_ENABLED = os.environ.get('LAB_PROFILE', '') not in ('', '0')
+PROFILE_SAMPLE_RATE = float(os.environ.get('LAB_PROFILE_SAMPLE', '0.05'))  # share of reruns run under cProfile
+PROFILE_SLOWEST = 10  # sampled reruns kept, slowest first
+PROFILE_STATS_LINES = 40
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Instrumentation:
+    """Timings of named code paths and cProfile captures of the slowest sampled reruns"""
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, slowest=PROFILE_SLOWEST):
+        self.sample_rate = sample_rate
+        self.slowest = slowest
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()  # cProfile captures one rerun at a time
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self._timings = {}  # name -> [count, total, max, per-bucket counts]
+            self._captures = []  # min-heap of (seconds, captured_at, label, stats text)
+
+    def record(self, name, seconds):
+        bucket = bisect.bisect_left(METRIC_BUCKETS, seconds)
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = [0, 0.0, 0.0, [0] * (len(METRIC_BUCKETS) + 1)]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+            timing[3][bucket] += 1
+
+    @contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    @contextmanager
+    def rerun(self, label):
+        """Time one script run, profiling a sample of them; label() names it once it has run"""
+        profiler = None
+        if random.random() < self.sample_rate and self._profiling.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record('rerun', elapsed)
+            if profiler is not None:
+                profiler.disable()
+                self._profiling.release()
+                self._keep_capture(elapsed, label(), profiler)
+
+    def _keep_capture(self, elapsed, label, profiler):
+        with self._lock:
+            if len(self._captures) >= self.slowest and elapsed <= self._captures[0][0]:
+                return
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(PROFILE_STATS_LINES)
+        capture = (elapsed, time.time(), label, stream.getvalue())
+        with self._lock:
+            if len(self._captures) < self.slowest:
+                heapq.heappush(self._captures, capture)
+            else:
+                heapq.heappushpop(self._captures, capture)
+
+    def timings(self):
+        """One row per instrumented path, most total time first"""
+        with self._lock:
+            rows = [(name, count, total, total / count, peak) for name, (count, total, peak, _) in self._timings.items()]
+        df = pd.DataFrame(rows, columns=['name', 'calls', 'total_s', 'mean_s', 'max_s'])
+        return df.sort_values('total_s', ascending=False, ignore_index=True)
+
+    def captures(self):
+        """(seconds, captured_at, label, stats text) of the slowest sampled reruns, slowest first"""
+        with self._lock:
+            return sorted(self._captures, reverse=True)
+
+    def prometheus(self):
+        """Timings in the Prometheus text exposition format"""
+        def label(name):
+            return name.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        with self._lock:
+            timings = {name: (count, total, peak, list(buckets))
+                       for name, (count, total, peak, buckets) in self._timings.items()}
+        lines = ['# HELP inoa_duration_seconds Time spent in instrumented code paths.',
+                 '# TYPE inoa_duration_seconds histogram']
+        for name, (count, total, _, buckets) in sorted(timings.items()):
+            cumulative = 0
+            for bound, n in zip(METRIC_BUCKETS + ('+Inf',), buckets):
+                cumulative += n
+                lines.append(f'inoa_duration_seconds_bucket{{name="{label(name)}",le="{bound}"}} {cumulative}')
+            lines.append(f'inoa_duration_seconds_sum{{name="{label(name)}"}} {total}')
+            lines.append(f'inoa_duration_seconds_count{{name="{label(name)}"}} {count}')
+        lines += ['# HELP inoa_duration_max_seconds Slowest call of each instrumented code path.',
+                  '# TYPE inoa_duration_max_seconds gauge']
+        lines += [f'inoa_duration_max_seconds{{name="{label(name)}"}} {peak}'
+                  for name, (_, _, peak, _) in sorted(timings.items())]
+        lines += ['# HELP inoa_instrumentation_start_time_seconds When these timings started.',
+                  '# TYPE inoa_instrumentation_start_time_seconds gauge',
+                  f'inoa_instrumentation_start_time_seconds {self.started}']
+        return '\n'.join(lines) + '\n'
+
+
+@st.cache_resource
+def get_instrumentation():
+    """Instrumentation shared by every session"""
+    return Instrumentation()
+
+
+INSTRUMENTATION = get_instrumentation() if PROFILE_ENABLED else None
+NULL_TIMER = nullcontext()
+
+
+def timed(name):
+    """Context manager timing its block as name; does nothing unless LAB_PROFILE is set"""
+    return NULL_TIMER if INSTRUMENTATION is None else INSTRUMENTATION.time(name)
+
+
+def profiled(name, section_key=None):
+    """Decorator timing each call as name, and name/<section> for a lazy_tabs key, when LAB_PROFILE is set"""
+    def decorate(fn):
+        if INSTRUMENTATION is None:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                INSTRUMENTATION.record(name, elapsed)
+                if section_key and section_key in st.session_state:
+                    INSTRUMENTATION.record(f"{name}/{st.session_state[section_key]}", elapsed)
+        return wrapper
+    return decorate
+
+
+def rerun_label():
+    """Role and section of the current run, naming profiler captures"""
+    role = st.session_state.get('user_role') or 'login'
+    section = st.session_state.get(f"{role}_section")
+    return f"{role}/{section}" if section else role
+
+
+def profiled_rerun(fn):
+    """Decorator timing each script run and profiling a sample; returns fn itself unless LAB_PROFILE is set"""
+    if INSTRUMENTATION is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper():
+        with INSTRUMENTATION.rerun(rerun_label):
+            return fn()
+    return wrapper
 
 
 # Initialize session state
+@profiled('initialize_session_state')
 def initialize_session_state():
     if 'logged_in' not in st.session_state:
         st.session_state.logged_in = False
@@ -55,87 +334,1215 @@ def initialize_session_state():
         st.session_state.username = None
     if 'customer_id' not in st.session_state:
         st.session_state.customer_id = None
-    if 'submissions_df' not in st.session_state:
-        st.session_state.submissions_df = pd.DataFrame(columns=[
-            'submission_id', 'technician_id', 'technician_name', 'customer_id',
-            'customer_name', 'test_type', 'parameters', 'timestamp', 'status',
-            'approval_notes', 'approved_by'
-        ])
+
+
+# Shared submission store
+DB_PATH = os.environ.get('LAB_DB_PATH',
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lab_data.db'))
+# Development only: offers to seed an empty store with demo submissions
+SAMPLE_DATA_ENABLED = os.environ.get('LAB_SAMPLE_DATA', '') not in ('', '0')
+
+SUBMISSION_COLUMNS = [
+    'submission_id', 'technician_id', 'technician_name', 'customer_id',
+    'customer_name', 'test_type', 'timestamp', 'status',
+    'approval_notes', 'approved_by', 'catalog_version', 'version'
+]
+
+READING_COLUMNS = ['submission_id', 'timestamp', 'param', 'value', 'status', 'reason']
+READING_STATUSES = ['accepted', 'pending_approval', 'rejected']
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Trend arrays for one customer and parameter: datetime64 timestamps, float64
+# values and whether each reading itself was accepted, in time order
+TrendSeries = namedtuple('TrendSeries', ['timestamps', 'values', 'accepted'])
+
+# One insert (old_status None) or update of a submission, in change feed order
+SubmissionEvent = namedtuple('SubmissionEvent', ['seq', 'submission_id', 'technician_id', 'customer_id',
+                                                 'old_status', 'new_status'])
+
+
+class StaleSubmissionError(Exception):
+    """A compare-and-set write found the submission changed since it was read"""
+
+
+class CatalogVersionError(ValueError):
+    """A parameter catalog changed its ranges without a new version number"""
+
+
+class SubmissionStore:
+    """Process-wide SQLite submission store in WAL mode, shared by every session; writes compare-and-set on version"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._create_schema()
+        self._series_cache = {}
+        self._series_lock = threading.Lock()
+        self._recorded_catalogs = {}
+        self._recorded_parameters = {}
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block inside a single write transaction"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    def _create_schema(self):
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS submissions (
+                    submission_id INTEGER PRIMARY KEY,
+                    technician_id TEXT NOT NULL,
+                    technician_name TEXT NOT NULL,
+                    customer_id TEXT NOT NULL,
+                    customer_name TEXT NOT NULL,
+                    test_type TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    approval_notes TEXT NOT NULL DEFAULT '',
+                    approved_by TEXT NOT NULL DEFAULT '',
+                    catalog_version INTEGER NOT NULL DEFAULT 1,
+                    version INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_customer '
+                         'ON submissions (customer_id, status, timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_technician '
+                         'ON submissions (technician_id, timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_status '
+                         'ON submissions (status, timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_timestamp '
+                         'ON submissions (timestamp)')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS readings (
+                    submission_id INTEGER NOT NULL REFERENCES submissions (submission_id) ON DELETE CASCADE,
+                    param TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    reason TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (submission_id, param)
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_readings_param ON readings (param, submission_id)')
+
+            columns = {r['name'] for r in conn.execute('PRAGMA table_info(submissions)')}
+            if 'parameters' in columns:
+                self._migrate_parameter_blobs(conn)
+            if 'change_seq' not in columns:
+                conn.execute('ALTER TABLE submissions ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0')
+                conn.execute('UPDATE submissions SET change_seq = submission_id')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_change_seq ON submissions (change_seq)')
+            if 'catalog_version' not in columns:
+                # Earlier submissions were validated against the original built-in ranges, catalog version 1
+                conn.execute('ALTER TABLE submissions ADD COLUMN catalog_version INTEGER NOT NULL DEFAULT 1')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_submissions_catalog ON submissions (catalog_version)')
+            if 'version' not in columns:
+                conn.execute('ALTER TABLE submissions ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS parameter_catalogs (
+                    version INTEGER PRIMARY KEY,
+                    ranges TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sequences (
+                    name TEXT PRIMARY KEY,
+                    next_value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO sequences (name, next_value) "
+                         "SELECT 'submission', COALESCE(MAX(submission_id), 0) + 1 FROM submissions")
+            conn.execute("INSERT OR IGNORE INTO sequences (name, next_value) "
+                         "SELECT 'change', COALESCE(MAX(change_seq), 0) + 1 FROM submissions")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS client_submissions (
+                    client_id TEXT PRIMARY KEY,
+                    submission_id INTEGER NOT NULL REFERENCES submissions (submission_id) ON DELETE CASCADE,
+                    fingerprint TEXT NOT NULL
+                )
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS revoked_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    expires_at INTEGER NOT NULL
+                )
+            """)
+
+            self._create_aggregates(conn)
+            self._create_customer_versions(conn)
+            self._create_change_feed(conn)
+
+    @staticmethod
+    def _create_aggregates(conn):
+        """Submission counts by (technician, customer, status, day), kept current by triggers"""
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'submission_counts'").fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS submission_counts (
+                technician_id TEXT NOT NULL,
+                customer_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                day TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (technician_id, customer_id, status, day)
+            ) WITHOUT ROWID
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_submission_counts_customer ON submission_counts (customer_id)')
+        if not exists:
+            conn.execute("""
+                INSERT INTO submission_counts (technician_id, customer_id, status, day, n)
+                SELECT technician_id, customer_id, status, substr(timestamp, 1, 10), COUNT(*)
+                FROM submissions GROUP BY 1, 2, 3, 4
+            """)
+
+        increment = """
+            INSERT INTO submission_counts (technician_id, customer_id, status, day, n)
+            VALUES (NEW.technician_id, NEW.customer_id, NEW.status, substr(NEW.timestamp, 1, 10), 1)
+            ON CONFLICT (technician_id, customer_id, status, day) DO UPDATE SET n = n + 1;
+        """
+        old_group = """
+            technician_id = OLD.technician_id AND customer_id = OLD.customer_id
+            AND status = OLD.status AND day = substr(OLD.timestamp, 1, 10)
+        """
+        decrement = f"""
+            UPDATE submission_counts SET n = n - 1 WHERE {old_group};
+            DELETE FROM submission_counts WHERE {old_group} AND n <= 0;
+        """
+        # Recreated on every start so stores created by earlier releases pick up trigger changes
+        for name in ('trg_counts_insert', 'trg_counts_delete', 'trg_counts_update'):
+            conn.execute(f'DROP TRIGGER IF EXISTS {name}')
+        conn.execute(f"CREATE TRIGGER trg_counts_insert AFTER INSERT ON submissions BEGIN {increment} END")
+        conn.execute(f"CREATE TRIGGER trg_counts_delete AFTER DELETE ON submissions BEGIN {decrement} END")
+        conn.execute("CREATE TRIGGER trg_counts_update "
+                     "AFTER UPDATE OF technician_id, customer_id, status, timestamp ON submissions "
+                     f"BEGIN {decrement} {increment} END")
+
+    @staticmethod
+    def _create_customer_versions(conn):
+        """Per-customer counter bumped by triggers whenever accepted data for that customer changes"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS customer_versions (
+                customer_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+        def bump(customer_id):
+            return (f"INSERT INTO customer_versions (customer_id, version) VALUES ({customer_id}, 1) "
+                    "ON CONFLICT (customer_id) DO UPDATE SET version = version + 1;")
+
+        def bump_for_reading(row):
+            return ("INSERT INTO customer_versions (customer_id, version) SELECT customer_id, 1 FROM submissions "
+                    f"WHERE submission_id = {row}.submission_id AND status = 'accepted' "
+                    "ON CONFLICT (customer_id) DO UPDATE SET version = version + 1;")
+
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_versions_insert AFTER INSERT ON submissions "
+                     f"WHEN NEW.status = 'accepted' BEGIN {bump('NEW.customer_id')} END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_versions_update AFTER UPDATE ON submissions "
+                     "WHEN OLD.status = 'accepted' OR NEW.status = 'accepted' "
+                     f"BEGIN {bump('OLD.customer_id')} {bump('NEW.customer_id')} END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_versions_delete AFTER DELETE ON submissions "
+                     f"WHEN OLD.status = 'accepted' BEGIN {bump('OLD.customer_id')} END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_versions_reading_insert AFTER INSERT ON readings "
+                     f"BEGIN {bump_for_reading('NEW')} END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_versions_reading_update AFTER UPDATE ON readings "
+                     f"BEGIN {bump_for_reading('OLD')} {bump_for_reading('NEW')} END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_versions_reading_delete AFTER DELETE ON readings "
+                     f"BEGIN {bump_for_reading('OLD')} END")
+
+    @staticmethod
+    def _create_change_feed(conn):
+        """Append-only log of submission inserts and updates, numbered by their change_seq"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS submission_events (
+                seq INTEGER PRIMARY KEY,
+                submission_id INTEGER NOT NULL,
+                technician_id TEXT NOT NULL,
+                customer_id TEXT NOT NULL,
+                old_status TEXT,
+                new_status TEXT NOT NULL
+            )
+        """)
+        log = ("INSERT INTO submission_events (seq, submission_id, technician_id, customer_id, old_status, new_status) "
+               "VALUES (NEW.change_seq, NEW.submission_id, NEW.technician_id, NEW.customer_id, {old}, NEW.status);")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_events_insert AFTER INSERT ON submissions "
+                     f"BEGIN {log.format(old='NULL')} END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_events_update AFTER UPDATE OF change_seq ON submissions "
+                     f"WHEN NEW.change_seq != OLD.change_seq BEGIN {log.format(old='OLD.status')} END")
+
+    @staticmethod
+    def _migrate_parameter_blobs(conn):
+        """Move readings out of the legacy JSON parameters column"""
+        for row in conn.execute('SELECT submission_id, parameters FROM submissions').fetchall():
+            conn.executemany(
+                'INSERT OR IGNORE INTO readings (submission_id, param, value, status, reason) VALUES (?, ?, ?, ?, ?)',
+                [(row['submission_id'], param, float(details['value']), details['status'], details.get('reason', ''))
+                 for param, details in json.loads(row['parameters']).items()]
+            )
+        conn.execute('ALTER TABLE submissions DROP COLUMN parameters')
+
+    @staticmethod
+    def _reserve(conn, name, count=1):
+        """Reserve count consecutive values from a named sequence and return the first"""
+        row = conn.execute('UPDATE sequences SET next_value = next_value + ? WHERE name = ? RETURNING next_value',
+                           (count, name)).fetchone()
+        return row[0] - count
+
+    def add_submission(self, submission, readings):
+        """Insert a submission with its validate_parameter readings and return its allocated submission_id"""
+        return self.add_submissions([(submission, readings)])[0]
+
+    def add_submissions(self, batch):
+        """Insert (submission, readings) pairs in one transaction and return their ids"""
+        if not batch:
+            return []
+        with self.transaction() as conn:
+            return self._insert_submissions(conn, batch)
+
+    def _insert_submissions(self, conn, batch):
+        """Insert (submission, readings) pairs inside an open transaction and return their ids"""
+        columns = [c for c in SUBMISSION_COLUMNS if c != 'submission_id'] + ['change_seq']
+        first_id = self._reserve(conn, 'submission', len(batch))
+        first_change = self._reserve(conn, 'change', len(batch))
+        submission_rows, reading_rows = [], []
+        for offset, (submission, readings) in enumerate(batch):
+            row = dict(submission, approval_notes=submission.get('approval_notes', ''),
+                       approved_by=submission.get('approved_by', ''),
+                       catalog_version=submission.get('catalog_version', 1), version=1,
+                       change_seq=first_change + offset)
+            row['timestamp'] = row['timestamp'].strftime(TIMESTAMP_FORMAT)
+            submission_rows.append([first_id + offset] + [row[c] for c in columns])
+            reading_rows.extend((first_id + offset, param, float(details['value']), details['status'],
+                                 details['reason'])
+                                for param, details in readings.items())
+        conn.executemany(
+            f"INSERT INTO submissions (submission_id, {', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 1))})",
+            submission_rows
+        )
+        conn.executemany(
+            'INSERT INTO readings (submission_id, param, value, status, reason) VALUES (?, ?, ?, ?, ?)',
+            reading_rows
+        )
+        return list(range(first_id, first_id + len(batch)))
+
+    def add_client_submissions(self, batch):
+        """Idempotently insert offline submissions by client id; returns {client_id: (submission_id, outcome)}"""
+        results = {}
+        with self.transaction() as conn:
+            client_ids = [item[0] for item in batch]
+            existing = {
+                r['client_id']: (r['submission_id'], r['fingerprint'])
+                for r in conn.execute(
+                    f"SELECT client_id, submission_id, fingerprint FROM client_submissions "
+                    f"WHERE client_id IN ({', '.join('?' * len(client_ids))})", client_ids)
+            } if client_ids else {}
+            new = []
+            for client_id, fingerprint, submission, readings in batch:
+                if client_id in existing:
+                    submission_id, stored = existing[client_id]
+                    results[client_id] = (submission_id, 'duplicate' if stored == fingerprint else 'conflict')
+                elif client_id not in results:
+                    new.append((client_id, fingerprint, submission, readings))
+                    results[client_id] = None
+            if new:
+                ids = self._insert_submissions(conn, [(submission, readings) for _, _, submission, readings in new])
+                conn.executemany(
+                    'INSERT INTO client_submissions (client_id, submission_id, fingerprint) VALUES (?, ?, ?)',
+                    [(client_id, submission_id, fingerprint)
+                     for (client_id, fingerprint, _, _), submission_id in zip(new, ids)]
+                )
+                for (client_id, _, _, _), submission_id in zip(new, ids):
+                    results[client_id] = (submission_id, 'created')
+        return results
+
+    @staticmethod
+    def _stale(conn, submission_id):
+        """StaleSubmissionError describing what a submission looks like now"""
+        row = conn.execute('SELECT status, approved_by FROM submissions WHERE submission_id = ?',
+                           (submission_id,)).fetchone()
+        if row is None:
+            return StaleSubmissionError(f"Submission #{submission_id} no longer exists")
+        decided = f" by {row['approved_by']}" if row['approved_by'] else ''
+        return StaleSubmissionError(f"Submission #{submission_id} was changed by someone else "
+                                    f"(now {row['status']}{decided}); the latest version is shown")
+
+    def update_status(self, submission_id, expected_version, status, approval_notes, approved_by):
+        """Record a manager decision and return its new version; raises StaleSubmissionError if the version moved on"""
+        submission_id = int(submission_id)
+        with self.transaction() as conn:
+            row = conn.execute(
+                'UPDATE submissions SET status = ?, approval_notes = ?, approved_by = ?, change_seq = ?, '
+                "version = version + 1 WHERE submission_id = ? AND version = ? AND status = 'pending_approval' "
+                'RETURNING version',
+                (status, approval_notes, approved_by, self._reserve(conn, 'change'), submission_id,
+                 int(expected_version))
+            ).fetchone()
+            if row is None:
+                raise self._stale(conn, submission_id)
+        return row[0]
+
+    def resubmit(self, submission_id, expected_version, technician_id, status, readings, catalog_version):
+        """Replace an edited submission's readings and return its new version; a compare-and-set like update_status"""
+        submission_id = int(submission_id)
+        with self.transaction() as conn:
+            row = conn.execute(
+                "UPDATE submissions SET status = ?, approval_notes = '', approved_by = '', catalog_version = ?, "
+                'change_seq = ?, version = version + 1 WHERE submission_id = ? AND version = ? AND technician_id = ? '
+                'RETURNING version',
+                (status, catalog_version, self._reserve(conn, 'change'), submission_id, int(expected_version),
+                 technician_id)
+            ).fetchone()
+            if row is None:
+                raise self._stale(conn, submission_id)
+            conn.execute('DELETE FROM readings WHERE submission_id = ?', (submission_id,))
+            conn.executemany(
+                'INSERT INTO readings (submission_id, param, value, status, reason) VALUES (?, ?, ?, ?, ?)',
+                [(submission_id, param, float(details['value']), details['status'], details['reason'])
+                 for param, details in readings.items()]
+            )
+        return row[0]
+
+    def record_catalog(self, catalog):
+        """Keep the ranges of a catalog version; raises CatalogVersionError if it was recorded with others"""
+        ranges = json.dumps(catalog.ranges, sort_keys=True)
+        if self._recorded_catalogs.get(catalog.version) == ranges:
+            return
+        with self.transaction() as conn:
+            conn.execute('INSERT OR IGNORE INTO parameter_catalogs (version, ranges, recorded_at) VALUES (?, ?, ?)',
+                         (catalog.version, ranges, datetime.now().strftime(TIMESTAMP_FORMAT)))
+            recorded = conn.execute('SELECT ranges FROM parameter_catalogs WHERE version = ?',
+                                    (catalog.version,)).fetchone()['ranges']
+        if recorded != ranges:
+            raise CatalogVersionError(f"Parameter catalog version {catalog.version} was recorded with other "
+                                      "ranges; give the edited catalog a new version")
+        self._recorded_catalogs[catalog.version] = ranges
+
+    def catalog_ranges(self, version):
+        """Ranges recorded for a catalog version, or None if it was never used"""
+        row = self._connect().execute('SELECT ranges FROM parameter_catalogs WHERE version = ?',
+                                      (version,)).fetchone()
+        return json.loads(row['ranges']) if row else None
+
+    def recorded_parameter(self, param):
+        """Unit and ranges of param in the newest recorded catalog that defines it, or None"""
+        if param not in self._recorded_parameters:
+            rows = self._connect().execute(
+                'SELECT ranges FROM parameter_catalogs ORDER BY recorded_at DESC, version DESC')
+            self._recorded_parameters[param] = next(
+                (ranges[param] for ranges in (json.loads(row['ranges']) for row in rows) if param in ranges), None)
+        return self._recorded_parameters[param]
+
+    def revoke_session(self, session_id, expires_at):
+        """Refuse a login session until its token expires; drops revocations that have lapsed"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM revoked_sessions WHERE expires_at <= ?', (int(time.time()),))
+            conn.execute('INSERT OR REPLACE INTO revoked_sessions (session_id, expires_at) VALUES (?, ?)',
+                         (session_id, int(expires_at)))
+
+    def session_revoked(self, session_id):
+        """True if the login session was revoked by a logout on any replica"""
+        return self._connect().execute('SELECT 1 FROM revoked_sessions WHERE session_id = ?',
+                                       (session_id,)).fetchone() is not None
+
+    def count_outdated(self, version):
+        """Number of submissions validated against a catalog version other than version"""
+        return self._connect().execute('SELECT COUNT(*) FROM submissions WHERE catalog_version != ?',
+                                       (version,)).fetchone()[0]
+
+    def revalidate(self, catalog, chunk_size=500):
+        """Reclassify submissions validated against another catalog version and return (revalidated, changed)"""
+        revalidated = changed = 0
+        last_id = 0
+        while True:
+            with self.transaction() as conn:
+                rows = conn.execute(
+                    'SELECT submission_id, status, version FROM submissions '
+                    'WHERE catalog_version != ? AND submission_id > ? ORDER BY submission_id LIMIT ?',
+                    (catalog.version, last_id, chunk_size)
+                ).fetchall()
+                if not rows:
+                    break
+                ids = [r['submission_id'] for r in rows]
+                last_id = ids[-1]
+
+                readings = self.readings(submission_ids=ids)
+                values = readings.pivot(index='submission_id', columns='param', values='value')
+                # Readings of parameters the catalog no longer has keep their status and do not count
+                values = values[[param for param in values.columns if param in catalog.bounds['index']]]
+                cell_codes, row_codes = validate_batch(values, bounds=catalog.bounds)
+                reading_rows = []
+                for i, submission_id in enumerate(values.index):
+                    for j, param in enumerate(values.columns):
+                        code = cell_codes[i, j]
+                        if code == STATUS_MISSING:
+                            continue
+                        status = READING_STATUSES[code]
+                        if status == 'accepted':
+                            reason = ACCEPTED_REASON
+                        elif status == 'pending_approval':
+                            reason = PENDING_REASON
+                        else:
+                            reason = validate_parameter(param, values.iat[i, j], catalog.ranges)[1]
+                        reading_rows.append((status, reason, int(submission_id), param))
+                statuses = {int(submission_id): READING_STATUSES[code]
+                            for submission_id, code in zip(values.index, row_codes) if code != STATUS_MISSING}
+
+                first_change = self._reserve(conn, 'change', len(rows))
+                conn.executemany('UPDATE readings SET status = ?, reason = ? WHERE submission_id = ? AND param = ?',
+                                 reading_rows)
+                for offset, row in enumerate(rows):
+                    # One write per submission, so its change event sees the status before and after.
+                    # Readings changed, so open approvals and edits of this submission must reload it.
+                    after = conn.execute(
+                        "UPDATE submissions SET status = CASE WHEN approved_by = '' THEN COALESCE(?, status) "
+                        'ELSE status END, catalog_version = ?, change_seq = ?, version = version + 1 '
+                        'WHERE submission_id = ? AND version = ? RETURNING status',
+                        (statuses.get(row['submission_id']), catalog.version, first_change + offset,
+                         row['submission_id'], row['version'])
+                    ).fetchone()
+                    if after is None:
+                        # Cannot happen while this transaction holds the write lock; roll the chunk back if it does
+                        raise self._stale(conn, row['submission_id'])
+                    changed += after[0] != row['status']
+            revalidated += len(rows)
+        return revalidated, changed
+
+    def latest_event(self):
+        """Sequence number of the newest submission event, 0 if there is none"""
+        return self._connect().execute('SELECT COALESCE(MAX(seq), 0) FROM submission_events').fetchone()[0]
+
+    def events_since(self, seq, limit=None):
+        """SubmissionEvents after seq, oldest first"""
+        sql = ('SELECT seq, submission_id, technician_id, customer_id, old_status, new_status '
+               'FROM submission_events WHERE seq > ? ORDER BY seq')
+        args = [seq]
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(int(limit))
+        return [SubmissionEvent(*r) for r in self._connect().execute(sql, args)]
+
+    def customer_version(self, customer_id):
+        """Counter keying the store's series cache; changes whenever the customer's accepted submissions change"""
+        row = self._connect().execute('SELECT version FROM customer_versions WHERE customer_id = ?',
+                                      (customer_id,)).fetchone()
+        return row[0] if row else 0
+
+    def customer_series(self, customer_id):
+        """Return {param: TrendSeries} for a customer's accepted submissions, cached until customer_version changes"""
+        version = self.customer_version(customer_id)
+        with self._series_lock:
+            cached = self._series_cache.get(customer_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        readings = self.readings(customer_id=customer_id, submission_status='accepted')
+        series = {
+            param: TrendSeries(group['timestamp'].to_numpy(), group['value'].to_numpy(),
+                               (group['status'] == 'accepted').to_numpy())
+            for param, group in readings.groupby('param', sort=False)
+        }
+        with self._series_lock:
+            self._series_cache[customer_id] = (version, series)
+        return series
+
+    def iter_history(self, customer_id, status='accepted', chunk_size=200):
+        """Yield (submissions, readings) frames for a customer's history, oldest first, chunk_size at a time"""
+        where, args = self._filters(customer_id=customer_id, status=status)
+        cursor = self._connect().cursor()
+        cursor.execute(f"SELECT {', '.join(SUBMISSION_COLUMNS)} FROM submissions{where} "
+                       "ORDER BY timestamp, submission_id", args)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            submissions = pd.DataFrame([tuple(r) for r in rows], columns=SUBMISSION_COLUMNS)
+            submissions['timestamp'] = pd.to_datetime(submissions['timestamp'], format=TIMESTAMP_FORMAT)
+            yield submissions, self.readings(submission_ids=submissions['submission_id'])
+
+    def status_counts(self, technician_id=None, customer_id=None, status=None):
+        """Submission counts per status from the aggregate table"""
+        where, args = self._filters(technician_id=technician_id, customer_id=customer_id, status=status)
+        rows = self._connect().execute(
+            f"SELECT status, SUM(n) FROM submission_counts{where} GROUP BY status", args
+        ).fetchall()
+        return {status: count for status, count in rows}
+
+    def daily_counts(self, technician_id=None, customer_id=None, status=None):
+        """Submissions per day and status from the aggregate table, one column per status"""
+        where, args = self._filters(technician_id=technician_id, customer_id=customer_id, status=status)
+        rows = self._connect().execute(
+            f"SELECT day, status, SUM(n) FROM submission_counts{where} GROUP BY day, status", args
+        ).fetchall()
+        counts = pd.DataFrame([tuple(r) for r in rows], columns=['day', 'status', 'n'])
+        counts['day'] = pd.to_datetime(counts['day'])
+        return counts.pivot_table(index='day', columns='status', values='n', fill_value=0, aggfunc='sum')
+
+    def update_statuses(self, expected_versions, status, approval_notes, approved_by):
+        """Decide many pending submissions in one transaction and return how many changed"""
+        if not expected_versions:
+            return 0
+        with self.transaction() as conn:
+            first_change = self._reserve(conn, 'change', len(expected_versions))
+            cursor = conn.executemany(
+                'UPDATE submissions SET status = ?, approval_notes = ?, approved_by = ?, change_seq = ?, '
+                "version = version + 1 WHERE submission_id = ? AND version = ? AND status = 'pending_approval'",
+                [(status, approval_notes, approved_by, first_change + i, int(submission_id), int(version))
+                 for i, (submission_id, version) in enumerate(expected_versions.items())]
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _filters(technician_id=None, customer_id=None, status=None, day=None):
+        """Build the WHERE clause shared by query and count"""
+        clauses, args = [], []
+        if technician_id is not None:
+            clauses.append('technician_id = ?')
+            args.append(technician_id)
+        if customer_id is not None:
+            clauses.append('customer_id = ?')
+            args.append(customer_id)
+        if status is not None:
+            clauses.append('status = ?')
+            args.append(status)
+        if day is not None:
+            clauses.append('timestamp >= ? AND timestamp < ?')
+            start = datetime.combine(day, datetime.min.time())
+            args.extend([start.strftime(TIMESTAMP_FORMAT), (start + timedelta(days=1)).strftime(TIMESTAMP_FORMAT)])
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), args
+
+    def query(self, technician_id=None, customer_id=None, status=None, day=None,
+              limit=None, offset=0, newest_first=False):
+        """Return matching submissions as a DataFrame, oldest first unless newest_first; limit/offset select one page"""
+        where, args = self._filters(technician_id=technician_id, customer_id=customer_id, status=status, day=day)
+        order = 'DESC' if newest_first else 'ASC'
+        sql = (f"SELECT {', '.join(SUBMISSION_COLUMNS)} FROM submissions{where} "
+               f"ORDER BY timestamp {order}, submission_id {order}")
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            args.extend([int(limit), int(offset)])
+
+        rows = self._connect().execute(sql, args).fetchall()
+        df = pd.DataFrame([tuple(r) for r in rows], columns=SUBMISSION_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format=TIMESTAMP_FORMAT)
+        return df
+
+    def count(self, technician_id=None, customer_id=None, status=None, day=None):
+        """Number of submissions matching the same filters as query"""
+        where, args = self._filters(technician_id=technician_id, customer_id=customer_id, status=status, day=day)
+        return self._connect().execute(f"SELECT COUNT(*) FROM submissions{where}", args).fetchone()[0]
+
+    def readings(self, submission_ids=None, customer_id=None, submission_status=None, params=None):
+        """Return parameter readings in long form, one typed row per reading, oldest submission first"""
+        clauses, args = [], []
+        if submission_ids is not None:
+            submission_ids = [int(i) for i in submission_ids]
+            clauses.append(f"r.submission_id IN ({', '.join('?' * len(submission_ids))})")
+            args.extend(submission_ids)
+        if customer_id is not None:
+            clauses.append('s.customer_id = ?')
+            args.append(customer_id)
+        if submission_status is not None:
+            clauses.append('s.status = ?')
+            args.append(submission_status)
+        if params is not None:
+            params = list(params)
+            clauses.append(f"r.param IN ({', '.join('?' * len(params))})")
+            args.extend(params)
+
+        sql = ('SELECT r.submission_id, s.timestamp, r.param, r.value, r.status, r.reason '
+               'FROM readings r JOIN submissions s ON s.submission_id = r.submission_id')
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY s.timestamp, r.submission_id, r.rowid'
+
+        rows = self._connect().execute(sql, args).fetchall()
+        df = pd.DataFrame([tuple(r) for r in rows], columns=READING_COLUMNS)
+        df['submission_id'] = df['submission_id'].astype('int64')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format=TIMESTAMP_FORMAT)
+        df['value'] = df['value'].astype('float64')
+        df['status'] = pd.Categorical(df['status'], categories=READING_STATUSES)
+        return df
+
+
+@st.cache_resource
+def get_store():
+    """Shared submission store used by every session"""
+    return SubmissionStore(DB_PATH)
 
 
 # User credentials and mappings
-USERS = {
-    # Technicians
-    'tech1': {'password': 'pass123', 'role': 'technician', 'name': 'John Doe',
-              'customers': ['CUST001', 'CUST002', 'CUST003']},
-    'tech2': {'password': 'pass456', 'role': 'technician', 'name': 'Jane Smith', 'customers': ['CUST004', 'CUST005']},
-
-    # Managers
-    'manager1': {'password': 'mgr123', 'role': 'manager', 'name': 'Bob Wilson'},
-    'manager2': {'password': 'mgr456', 'role': 'manager', 'name': 'Alice Johnson'},
-
-    # Customers
-    'customer1': {'password': 'cust123', 'role': 'customer', 'name': 'ABC Corp', 'customer_id': 'CUST001'},
-    'customer2': {'password': 'cust456', 'role': 'customer', 'name': 'XYZ Ltd', 'customer_id': 'CUST002'},
-    'customer3': {'password': 'cust789', 'role': 'customer', 'name': 'Tech Solutions', 'customer_id': 'CUST003'},
-    'customer4': {'password': 'cust321', 'role': 'customer', 'name': 'Green Energy', 'customer_id': 'CUST004'},
-    'customer5': {'password': 'cust654', 'role': 'customer', 'name': 'Eco Systems', 'customer_id': 'CUST005'},
-}
-
-CUSTOMER_NAMES = {
-    'CUST001': 'ABC Corp',
-    'CUST002': 'XYZ Ltd',
-    'CUST003': 'Tech Solutions',
-    'CUST004': 'Green Energy',
-    'CUST005': 'Eco Systems'
-}
-
-# Parameter validation ranges
-PARAMETER_RANGES = {
-    'soil_ph': {'acceptable': (6.0, 8.0), 'approval': (5.5, 8.5), 'unit': 'pH'},
-    'soil_ec': {'acceptable': (0.1, 2.0), 'approval': (0.05, 3.0), 'unit': 'dS/m'},
-    'water_ph': {'acceptable': (6.5, 8.5), 'approval': (6.0, 9.0), 'unit': 'pH'},
-    'water_ec': {'acceptable': (0.1, 1.5), 'approval': (0.05, 2.0), 'unit': 'dS/m'},
-    # Full suite parameters
-    'nitrogen': {'acceptable': (10, 50), 'approval': (5, 70), 'unit': 'mg/kg'},
-    'phosphorus': {'acceptable': (15, 80), 'approval': (10, 100), 'unit': 'mg/kg'},
-    'potassium': {'acceptable': (100, 400), 'approval': (80, 500), 'unit': 'mg/kg'},
-    'organic_matter': {'acceptable': (2.0, 6.0), 'approval': (1.0, 8.0), 'unit': '%'},
-    'calcium': {'acceptable': (200, 800), 'approval': (150, 1000), 'unit': 'mg/kg'},
-    'magnesium': {'acceptable': (50, 200), 'approval': (30, 250), 'unit': 'mg/kg'},
-    'sulfur': {'acceptable': (10, 30), 'approval': (5, 40), 'unit': 'mg/kg'},
-    'iron': {'acceptable': (20, 100), 'approval': (10, 150), 'unit': 'mg/kg'},
-    'manganese': {'acceptable': (5, 50), 'approval': (2, 80), 'unit': 'mg/kg'},
-    'zinc': {'acceptable': (1, 10), 'approval': (0.5, 15), 'unit': 'mg/kg'},
-    'copper': {'acceptable': (1, 5), 'approval': (0.5, 8), 'unit': 'mg/kg'},
-    'boron': {'acceptable': (0.5, 2.0), 'approval': (0.2, 3.0), 'unit': 'mg/kg'},
-    'chloride': {'acceptable': (10, 100), 'approval': (5, 150), 'unit': 'mg/L'},
-    'sodium': {'acceptable': (20, 200), 'approval': (10, 300), 'unit': 'mg/kg'},
-    'cec': {'acceptable': (10, 30), 'approval': (5, 40), 'unit': 'cmol/kg'},
-    'bulk_density': {'acceptable': (1.0, 1.6), 'approval': (0.8, 1.8), 'unit': 'g/cm³'},
-}
-
-BASIC_PARAMS = ['soil_ph', 'soil_ec', 'water_ph', 'water_ec']
-FULL_SUITE_PARAMS = list(PARAMETER_RANGES.keys())
-
-
-def validate_parameter(param_name, value):
+USERS_PATH = os.environ.get('LAB_USERS_PATH',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'users.json'))
+CUSTOMERS_PATH = os.environ.get('LAB_CUSTOMERS_PATH',
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), 'customers.json'))
+RELOAD_CHECK_SECONDS = 2
+
+
+class ReloadingFiles:
+    """Base for configuration loaded from files; subclasses' _load snapshots are swapped in on change"""
+
+    def __init__(self, *paths):
+        self.paths = paths
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._mtimes = self._stat()
+        self._snapshot = self._load()
+
+    def _stat(self):
+        return tuple(os.stat(path).st_mtime_ns for path in self.paths)
+
+    def _load(self):
+        raise NotImplementedError
+
+    def snapshot(self):
+        """Current snapshot, reloading first if one of the files changed"""
+        now = time.monotonic()
+        if now - self._checked_at >= RELOAD_CHECK_SECONDS:
+            with self._lock:
+                if now - self._checked_at >= RELOAD_CHECK_SECONDS:
+                    self._checked_at = now
+                    try:
+                        mtimes = self._stat()
+                        if mtimes != self._mtimes:
+                            self._snapshot = self._load()
+                            self._mtimes = mtimes
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        logger.warning("Reloading %s failed, keeping previous version: %s", ', '.join(self.paths), e)
+        return self._snapshot
+
+
+# One loaded version of the registry files with their lookup indexes
+RegistrySnapshot = namedtuple('RegistrySnapshot', [
+    'users',                    # username -> user record (scrypt hash, role, name, ...)
+    'customer_names',           # customer_id -> name
+    'customers_by_technician',  # username -> frozenset of assigned customer ids
+    'technician_customers',     # username -> sorted tuple of assigned customer ids, for pickers
+    'users_by_role',            # role -> sorted usernames
+])
+
+
+class Registry(ReloadingFiles):
+    """Users, customers and technician assignments loaded from JSON files into reloadable indexes"""
+
+    def _load(self):
+        users_path, customers_path = self.paths
+        with open(users_path, encoding='utf-8') as f:
+            users = json.load(f)
+        with open(customers_path, encoding='utf-8') as f:
+            customers = json.load(f)
+
+        users_by_role = {}
+        for username, info in users.items():
+            users_by_role.setdefault(info['role'], []).append(username)
+        technician_customers = {username: tuple(sorted(set(info.get('customers', []))))
+                                for username, info in users.items() if info['role'] == 'technician'}
+        return RegistrySnapshot(
+            users=users,
+            customer_names={customer_id: info['name'] for customer_id, info in customers.items()},
+            customers_by_technician={username: frozenset(ids) for username, ids in technician_customers.items()},
+            technician_customers=technician_customers,
+            users_by_role={role: sorted(names) for role, names in users_by_role.items()},
+        )
+
+
+@st.cache_resource
+def get_registry():
+    """Registry shared by every session"""
+    return Registry(USERS_PATH, CUSTOMERS_PATH)
+
+
+REGISTRY = get_registry().snapshot()
+USERS = REGISTRY.users
+CUSTOMER_NAMES = REGISTRY.customer_names
+
+# Parameter catalog
+CATALOG_PATH = os.environ.get('LAB_CATALOG_PATH',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parameters.json'))
+
+ACCEPTED_REASON = 'Value within acceptable range'
+PENDING_REASON = 'Value requires manager approval'
+
+# Batch validation
+STATUS_MISSING = -1
+STATUS_CODES = {status: code for code, status in enumerate(READING_STATUSES)}
+
+
+def compile_parameter_ranges(ranges):
+    """Precompute bound arrays for validate_batch, one slot per parameter"""
+    params = list(ranges)
+    return {
+        'params': params,
+        'index': {param: i for i, param in enumerate(params)},
+        'acceptable_min': np.array([ranges[p]['acceptable'][0] for p in params], dtype='float64'),
+        'acceptable_max': np.array([ranges[p]['acceptable'][1] for p in params], dtype='float64'),
+        'approval_min': np.array([ranges[p]['approval'][0] for p in params], dtype='float64'),
+        'approval_max': np.array([ranges[p]['approval'][1] for p in params], dtype='float64'),
+    }
+
+
+# One version of the parameter catalog, compiled for validation
+CatalogVersion = namedtuple('CatalogVersion', [
+    'version',            # integer declared by the catalog file
+    'ranges',             # param -> {'acceptable': (min, max), 'approval': (min, max), 'unit'}
+    'basic_params',       # parameters of a Basic Test
+    'full_suite_params',  # parameters of a Full Suite, in entry order
+    'bounds',             # compile_parameter_ranges(ranges)
+])
+
+
+class ParameterCatalog(ReloadingFiles):
+    """Versioned parameter ranges loaded from parameters.json"""
+
+    def _load(self):
+        snapshot = self._read()
+        previous = getattr(self, '_snapshot', None)
+        if previous is not None and previous.version == snapshot.version and previous.ranges != snapshot.ranges:
+            raise CatalogVersionError(f"{self.paths[0]} changed its ranges but kept version {snapshot.version}")
+        return snapshot
+
+    def _read(self):
+        with open(self.paths[0], encoding='utf-8') as f:
+            catalog = json.load(f)
+
+        ranges = {}
+        for param, info in catalog['parameters'].items():
+            acceptable, approval = tuple(info['acceptable']), tuple(info['approval'])
+            if not approval[0] <= acceptable[0] <= acceptable[1] <= approval[1]:
+                raise ValueError(f"{param}: acceptable range must lie within the approval range")
+            ranges[param] = {'acceptable': acceptable, 'approval': approval, 'unit': info['unit']}
+        basic_params = list(catalog['basic_params'])
+        unknown = set(basic_params) - set(ranges)
+        if unknown:
+            raise ValueError(f"Unknown basic parameters: {', '.join(sorted(unknown))}")
+
+        return CatalogVersion(
+            version=int(catalog['version']),
+            ranges=ranges,
+            basic_params=basic_params,
+            full_suite_params=list(ranges),
+            bounds=compile_parameter_ranges(ranges),
+        )
+
+
+@st.cache_resource
+def get_catalog():
+    """Parameter catalog shared by every session"""
+    return ParameterCatalog(CATALOG_PATH)
+
+
+CATALOG = get_catalog().snapshot()
+PARAMETER_RANGES = CATALOG.ranges
+BASIC_PARAMS = CATALOG.basic_params
+FULL_SUITE_PARAMS = CATALOG.full_suite_params
+PARAMETER_BOUNDS = CATALOG.bounds
+
+
+def parameter_info(param, store=None):
+    """Unit and ranges of param, falling back to recorded catalogs for parameters since removed"""
+    info = PARAMETER_RANGES.get(param)
+    if info is None:
+        info = (store or get_store()).recorded_parameter(param) or {'unit': ''}
+    return info
+
+
+def validate_parameter(param_name, value, ranges=None):
     """Validate parameter value and return status"""
-    if param_name not in PARAMETER_RANGES:
+    ranges = PARAMETER_RANGES if ranges is None else ranges
+    if param_name not in ranges:
         return 'rejected', f'Unknown parameter: {param_name}'
 
-    ranges = PARAMETER_RANGES[param_name]
+    ranges = ranges[param_name]
     acceptable_min, acceptable_max = ranges['acceptable']
     approval_min, approval_max = ranges['approval']
 
     if acceptable_min <= value <= acceptable_max:
-        return 'accepted', 'Value within acceptable range'
+        return 'accepted', ACCEPTED_REASON
     elif approval_min <= value <= approval_max:
-        return 'pending_approval', 'Value requires manager approval'
+        return 'pending_approval', PENDING_REASON
     else:
         return 'rejected', f'Value outside acceptable range ({approval_min}-{approval_max} {ranges["unit"]})'
 
 
+def validate_readings(parameter_values, ranges=None):
+    """Validate one sample's readings; returns (readings, overall status, rejection reasons)"""
+    all_statuses = {}
+    overall_status = 'accepted'
+    rejection_reasons = []
+
+    with timed('validate_parameter'):
+        for param, value in parameter_values.items():
+            status, reason = validate_parameter(param, value, ranges)
+            all_statuses[param] = {'value': value, 'status': status, 'reason': reason}
+
+            if status == 'pending_approval' and overall_status == 'accepted':
+                overall_status = 'pending_approval'
+            elif status == 'rejected':
+                overall_status = 'rejected'
+                rejection_reasons.append(f"{param}: {reason}")
+    return all_statuses, overall_status, rejection_reasons
+
+
+@profiled('validate_batch')
+def validate_batch(values, params=None, bounds=None):
+    """Validate a matrix of readings and return (cell_codes, row_codes) as int8 STATUS_CODES arrays"""
+    bounds = bounds or PARAMETER_BOUNDS
+    if isinstance(values, pd.DataFrame):
+        params = list(values.columns) if params is None else params
+        values = values[params].to_numpy(dtype='float64')
+    values = np.atleast_2d(np.asarray(values, dtype='float64'))
+    params = bounds['params'] if params is None else list(params)
+
+    slots = np.array([bounds['index'].get(p, -1) for p in params], dtype='intp')
+    known = slots >= 0
+    safe_slots = np.where(known, slots, 0)
+
+    acceptable = (values >= bounds['acceptable_min'][safe_slots]) & (values <= bounds['acceptable_max'][safe_slots])
+    approval = (values >= bounds['approval_min'][safe_slots]) & (values <= bounds['approval_max'][safe_slots])
+
+    cell_codes = np.full(values.shape, STATUS_CODES['rejected'], dtype='int8')
+    cell_codes[approval & known] = STATUS_CODES['pending_approval']
+    cell_codes[acceptable & known] = STATUS_CODES['accepted']
+    cell_codes[np.isnan(values)] = STATUS_MISSING
+
+    row_codes = cell_codes.max(axis=1) if cell_codes.shape[1] else np.full(len(values), STATUS_MISSING, dtype='int8')
+    return cell_codes, row_codes
+
+
+# Bulk ingest
+BULK_CHUNK_ROWS = 500
+BULK_FILE_TYPES = ['csv', 'xlsx', 'parquet']
+TEST_TYPES = ['Basic Test', 'Full Suite']
+
+
+def read_upload_chunks(uploaded_file, chunk_rows=BULK_CHUNK_ROWS):
+    """Yield an uploaded CSV/XLSX/Parquet file as DataFrames of at most chunk_rows rows"""
+    name = uploaded_file.name.lower()
+    if name.endswith('.csv'):
+        yield from pd.read_csv(uploaded_file, chunksize=chunk_rows)
+    elif name.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(uploaded_file).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    elif name.endswith('.xlsx'):
+        import openpyxl
+        workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_rows:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported file type: {uploaded_file.name}")
+
+
+def prepare_bulk_chunk(chunk, first_row, technician_id, technician_name, assigned_customers):
+    """Validate one upload chunk like manual entry and return (batch, rejects) for add_submissions"""
+    chunk = chunk.rename(columns=lambda c: str(c).strip().lower().replace(' ', '_')).reset_index(drop=True)
+    if 'customer_id' not in chunk.columns:
+        raise ValueError("Upload must have a customer_id column")
+
+    customer_ids = chunk['customer_id'].astype(str).str.strip()
+    values = chunk.reindex(columns=FULL_SUITE_PARAMS).apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64')
+    basic_mask = np.isin(FULL_SUITE_PARAMS, BASIC_PARAMS)
+
+    if 'test_type' in chunk.columns:
+        test_types = chunk['test_type'].astype(str).str.strip()
+    else:
+        # Without a test_type column, rows with every full-suite value are Full Suite
+        has_full_suite = ~np.isnan(values).any(axis=1)
+        test_types = pd.Series(np.where(has_full_suite, 'Full Suite', 'Basic Test'))
+
+    required = (test_types.to_numpy() == 'Full Suite')[:, None] | basic_mask[None, :]
+    missing = required & ~(values > 0)
+    cell_codes, row_codes = validate_batch(np.where(required, values, np.nan), FULL_SUITE_PARAMS)
+
+    if 'timestamp' in chunk.columns:
+        timestamps = pd.to_datetime(chunk['timestamp'], errors='coerce').fillna(pd.Timestamp(datetime.now()))
+    else:
+        timestamps = pd.Series(pd.Timestamp(datetime.now()), index=chunk.index)
+
+    batch, rejects = [], []
+    for i, customer_id in enumerate(customer_ids):
+        row_number = first_row + i
+        test_type = test_types.iloc[i]
+        if customer_id not in assigned_customers:
+            rejects.append({'row': row_number, 'customer_id': customer_id,
+                            'reason': 'Customer ID not assigned to you or invalid'})
+            continue
+        if test_type not in TEST_TYPES:
+            rejects.append({'row': row_number, 'customer_id': customer_id,
+                            'reason': f'Unknown test type: {test_type}'})
+            continue
+        if missing[i].any():
+            absent = [FULL_SUITE_PARAMS[j] for j in np.flatnonzero(missing[i])]
+            rejects.append({'row': row_number, 'customer_id': customer_id,
+                            'reason': f"Missing values: {', '.join(absent)}"})
+            continue
+        if row_codes[i] == STATUS_CODES['rejected']:
+            reasons = [f"{FULL_SUITE_PARAMS[j]}: {validate_parameter(FULL_SUITE_PARAMS[j], values[i, j])[1]}"
+                       for j in np.flatnonzero(cell_codes[i] == STATUS_CODES['rejected'])]
+            rejects.append({'row': row_number, 'customer_id': customer_id, 'reason': '; '.join(reasons)})
+            continue
+
+        readings = {}
+        for j in np.flatnonzero(required[i]):
+            status = READING_STATUSES[cell_codes[i, j]]
+            readings[FULL_SUITE_PARAMS[j]] = {
+                'value': values[i, j],
+                'status': status,
+                'reason': ACCEPTED_REASON if status == 'accepted' else PENDING_REASON
+            }
+        batch.append(({
+            'technician_id': technician_id,
+            'technician_name': technician_name,
+            'customer_id': customer_id,
+            'customer_name': CUSTOMER_NAMES.get(customer_id, "Unknown Customer"),
+            'test_type': test_type,
+            'timestamp': timestamps.iloc[i].to_pydatetime(),
+            'status': READING_STATUSES[row_codes[i]],
+            'catalog_version': CATALOG.version,
+            'approval_notes': '',
+            'approved_by': ''
+        }, readings))
+
+    return batch, rejects
+
+
+def bulk_upload_form(user_info):
+    """Upload many samples from an instrument export and commit them at once"""
+    st.caption("Columns: customer_id, optional test_type and timestamp, and one column per parameter "
+               f"(e.g. {', '.join(BASIC_PARAMS)}). Rows without a test_type are Full Suite "
+               "when every parameter is present.")
+    uploaded_file = st.file_uploader("Upload samples", type=BULK_FILE_TYPES, key='bulk_upload')
+
+    if uploaded_file is not None and st.button("Import Samples", use_container_width=True):
+        batch, rejects = [], []
+        try:
+            first_row = 1
+            for chunk in read_upload_chunks(uploaded_file):
+                chunk_batch, chunk_rejects = prepare_bulk_chunk(
+                    chunk, first_row, st.session_state.username, user_info['name'],
+                    REGISTRY.customers_by_technician[st.session_state.username]
+                )
+                batch.extend(chunk_batch)
+                rejects.extend(chunk_rejects)
+                first_row += len(chunk)
+        except (ValueError, UnicodeDecodeError, zipfile.BadZipFile, pd.errors.ParserError) as e:
+            st.error(f"❌ Could not read file: {e}")
+            return
+
+        get_store().add_submissions(batch)
+
+        pending_count = sum(1 for submission, _ in batch if submission['status'] == 'pending_approval')
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Accepted", len(batch) - pending_count)
+        with col2:
+            st.metric("Pending Approval", pending_count)
+        with col3:
+            st.metric("Rejected", len(rejects))
+
+        if rejects:
+            st.warning("⚠️ Some rows were not imported:")
+            st.dataframe(pd.DataFrame(rejects, columns=['row', 'customer_id', 'reason']), use_container_width=True)
+        else:
+            st.success("✅ All rows imported!")
+
+
+# Authentication
+SCRYPT_PARAMS = {'n': 2 ** 14, 'r': 8, 'p': 1}
+SCRYPT_MAXMEM = 64 * 1024 * 1024
+LOGIN_WORKERS = 4
+SESSION_TOKEN_TTL = 12 * 60 * 60
+SESSION_COOKIE = 'lab_session'
+TOKEN_CACHE_ENTRIES = 4096
+
+# Verified against when the username is unknown, so both paths cost one hash
+DUMMY_PASSWORD_HASH = 'scrypt$16384$8$1$Q0upt2VebdYhAwj9O5MYyw==$2jRPnSyge+cEs9AkEApw4jYFTeZnQ1/g1Uobdq5irXc='
+
+
+def hash_password(password, salt=None):
+    """Encode a password as scrypt$n$r$p$salt$digest for the user store"""
+    salt = salt or os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, maxmem=SCRYPT_MAXMEM, dklen=32, **SCRYPT_PARAMS)
+    return '$'.join(['scrypt', str(SCRYPT_PARAMS['n']), str(SCRYPT_PARAMS['r']), str(SCRYPT_PARAMS['p']),
+                     base64.b64encode(salt).decode(), base64.b64encode(digest).decode()])
+
+
+def verify_password(password, encoded):
+    """Check a password against an encoded hash in constant time"""
+    _, n, r, p, salt, digest = encoded.split('$')
+    expected = base64.b64decode(digest)
+    candidate = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt), n=int(n), r=int(r), p=int(p),
+                               maxmem=SCRYPT_MAXMEM, dklen=len(expected))
+    return hmac.compare_digest(candidate, expected)
+
+
+class Authenticator:
+    """Password checks on a pool that bounds concurrent scrypt work and memory, and signed session tokens"""
+
+    def __init__(self, registry, store, secret, max_workers=LOGIN_WORKERS, token_ttl=SESSION_TOKEN_TTL,
+                 cache_entries=TOKEN_CACHE_ENTRIES):
+        self._registry = registry
+        self._store = store
+        self._secret = secret
+        self._token_ttl = token_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='login')
+        self._tokens = {}  # token -> (username, session_id, expiry), saves re-checking signatures
+        self._cache_entries = cache_entries
+        self._lock = threading.Lock()
+
+    def verify(self, username, password):
+        """True if the password matches; blocks the caller until the pool has hashed it"""
+        users = self._registry.snapshot().users
+        encoded = users.get(username, {}).get('password_hash', DUMMY_PASSWORD_HASH)
+        matched = self._executor.submit(verify_password, password, encoded).result()
+        return matched and username in users
+
+    def _sign(self, payload):
+        return hmac.new(self._secret, payload.encode(), hashlib.sha256).hexdigest()
+
+    def _remember(self, token, entry):
+        """Cache a checked token, dropping expired entries and then the oldest past the size limit"""
+        with self._lock:
+            self._tokens[token] = entry
+            if len(self._tokens) > self._cache_entries:
+                now = time.time()
+                for stale in [t for t, (_, _, expiry) in self._tokens.items() if expiry <= now]:
+                    del self._tokens[stale]
+                while len(self._tokens) > self._cache_entries:
+                    del self._tokens[next(iter(self._tokens))]
+
+    def _decode(self, token):
+        """(username, session_id, expiry) of a correctly signed token, else None"""
+        with self._lock:
+            cached = self._tokens.get(token)
+        if cached is not None:
+            return cached
+        # Issued before a restart or by another replica sharing the secret
+        try:
+            encoded, signature = token.split('.')
+            payload = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode()
+            username, session_id, expiry = payload.rsplit(':', 2)
+            entry = (username, session_id, int(expiry))
+        except ValueError:
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        self._remember(token, entry)
+        return entry
+
+    def issue_token(self, username):
+        """Signed token for a new login session that lets it resume until it expires"""
+        expiry = int(time.time()) + self._token_ttl
+        session_id = secrets.token_urlsafe(16)
+        payload = f"{username}:{session_id}:{expiry}"
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=') + '.' + self._sign(payload)
+        self._remember(token, (username, session_id, expiry))
+        return token
+
+    def resume(self, token):
+        """Username for a valid, unexpired and unrevoked token, else None"""
+        entry = self._decode(token)
+        if entry is None:
+            return None
+        username, session_id, expiry = entry
+        if expiry <= time.time() or username not in self._registry.snapshot().users:
+            return None
+        if self._store.session_revoked(session_id):
+            return None
+        return username
+
+    def revoke(self, token):
+        """End a token's login session everywhere on logout"""
+        entry = self._decode(token)
+        if entry is None:
+            return
+        with self._lock:
+            self._tokens.pop(token, None)
+        self._store.revoke_session(entry[1], entry[2])
+
+
+@st.cache_resource
+def get_authenticator():
+    """Authenticator shared by every session, signing with LAB_SESSION_SECRET or a per-process secret"""
+    return Authenticator(get_registry(), get_store(),
+                         os.environ.get('LAB_SESSION_SECRET', '').encode() or os.urandom(32))
+
+
+def set_session_cookie(token, max_age):
+    """Queue the browser's session cookie to be set on the next run, or cleared with max_age 0"""
+    st.session_state.session_cookie_update = (token, max_age)
+
+
+def write_session_cookie():
+    """Apply a queued session cookie change from a zero-height component"""
+    update = st.session_state.pop('session_cookie_update', None)
+    if update is None:
+        return
+    import streamlit.components.v1 as components
+    token, max_age = update
+    components.html(f"""
+    <script>
+    const parent = window.parent;
+    const secure = parent.location.protocol === 'https:' ? '; Secure' : '';
+    parent.document.cookie = `{SESSION_COOKIE}={token}; Path=/; Max-Age={int(max_age)}; SameSite=Strict${{secure}}`;
+    </script>
+    """, height=0)
+
+
+def end_session():
+    """Log this browser session out and clear its cookie, which its connection keeps reporting"""
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    initialize_session_state()
+    st.session_state.rejected_session = st.context.cookies.get(SESSION_COOKIE)
+    set_session_cookie('', 0)
+
+
+def start_session(username, token):
+    """Mark the current session as logged in as username with a session token"""
+    st.session_state.logged_in = True
+    st.session_state.session_token = token
+    st.session_state.username = username
+    st.session_state.user_role = USERS[username]['role']
+    if USERS[username]['role'] == 'customer':
+        st.session_state.customer_id = USERS[username]['customer_id']
+
+
+@profiled('login_page')
 def login_page():
     """Display login page"""
     st.markdown('<div class="main-header"><h1>🔬 Lab Management System</h1></div>', unsafe_allow_html=True)
@@ -148,12 +1555,11 @@ def login_page():
         password = st.text_input("Password", type="password")
 
         if st.button("Login", use_container_width=True):
-            if username in USERS and USERS[username]['password'] == password:
-                st.session_state.logged_in = True
-                st.session_state.username = username
-                st.session_state.user_role = USERS[username]['role']
-                if USERS[username]['role'] == 'customer':
-                    st.session_state.customer_id = USERS[username]['customer_id']
+            authenticator = get_authenticator()
+            if authenticator.verify(username, password):
+                token = authenticator.issue_token(username)
+                start_session(username, token)
+                set_session_cookie(token, SESSION_TOKEN_TTL)
                 st.success("Login successful!")
                 st.rerun()
             else:
@@ -170,51 +1576,42 @@ def login_page():
             st.write("- customer1 / cust123")
 
 
-def technician_interface():
-    """Lab Technician Interface"""
-    st.markdown('<div class="main-header"><h1>🔬 Lab Technician Interface</h1></div>', unsafe_allow_html=True)
-
-    user_info = USERS[st.session_state.username]
-    st.write(f"Welcome, **{user_info['name']}**")
-
-    tab1, tab2 = st.tabs(["New Submission", "Submission History"])
-
-    with tab1:
-        st.subheader("New Test Submission")
-
-        # Customer selection
-        col1, col2 = st.columns(2)
-        with col1:
-            customer_id_option = st.selectbox(
-                "Select Customer ID",
-                options=[''] + user_info['customers'],
-                key='customer_select'
-            )
+def single_sample_form(user_info):
+    """Enter one sample's readings by hand and submit them"""
+    # Customer selection
+    col1, col2 = st.columns(2)
+    with col1:
+        customer_id_option = st.selectbox(
+            "Select Customer ID",
+            options=[''] + list(REGISTRY.technician_customers[st.session_state.username]),
+            key='customer_select'
+        )
 
-        with col2:
-            # Manual customer ID entry option
-            manual_customer_id = st.text_input("Or enter Customer ID manually")
+    with col2:
+        # Manual customer ID entry option
+        manual_customer_id = st.text_input("Or enter Customer ID manually")
 
-        # Determine final customer ID
-        final_customer_id = manual_customer_id if manual_customer_id else customer_id_option
+    # Determine final customer ID
+    final_customer_id = manual_customer_id if manual_customer_id else customer_id_option
 
-        if final_customer_id:
-            if final_customer_id not in user_info['customers']:
-                st.error("❌ Customer ID not assigned to you or invalid")
-                return
+    if final_customer_id:
+        if final_customer_id not in REGISTRY.customers_by_technician[st.session_state.username]:
+            st.error("❌ Customer ID not assigned to you or invalid")
+            return
 
-            customer_name = CUSTOMER_NAMES.get(final_customer_id, "Unknown Customer")
-            st.success(f"✅ Customer: {customer_name}")
+        customer_name = CUSTOMER_NAMES.get(final_customer_id, "Unknown Customer")
+        st.success(f"✅ Customer: {customer_name}")
 
-            # Test type selection
-            test_type = st.radio("Select Test Type", ["Basic Test", "Full Suite"])
+        # Test type selection
+        test_type = st.radio("Select Test Type", ["Basic Test", "Full Suite"])
 
-            # Parameter entry
-            st.subheader("Enter Parameters")
+        # Parameter entry, batched in a form so editing fields does not rerun the script
+        st.subheader("Enter Parameters")
 
-            params = BASIC_PARAMS if test_type == "Basic Test" else FULL_SUITE_PARAMS
-            parameter_values = {}
+        params = BASIC_PARAMS if test_type == "Basic Test" else FULL_SUITE_PARAMS
+        parameter_values = {}
 
+        with st.form("parameter_entry", border=False):
             # Create columns for better layout
             cols = st.columns(2)
 
@@ -224,123 +1621,640 @@ def technician_interface():
                     param_info = PARAMETER_RANGES[param]
                     label = param.replace('_', ' ').title()
                     unit = param_info['unit']
+                    acceptable_min, acceptable_max = param_info['acceptable']
+                    approval_min, approval_max = param_info['approval']
 
                     value = st.number_input(
                         f"{label} ({unit})",
                         min_value=0.0,
+                        value=None,
                         step=0.1,
-                        key=f"param_{param}"
+                        key=f"param_{param}",
+                        placeholder=f"{acceptable_min}–{acceptable_max}",
+                        help=f"Acceptable {acceptable_min}–{acceptable_max} {unit}; "
+                             f"{approval_min}–{approval_max} {unit} needs manager approval"
                     )
                     parameter_values[param] = value
 
-            # Submission
-            if st.button("Submit Test Results", use_container_width=True):
-                if all(v > 0 for v in parameter_values.values()):
-                    # Validate all parameters
-                    all_statuses = {}
-                    overall_status = 'accepted'
-                    rejection_reasons = []
-
-                    for param, value in parameter_values.items():
-                        status, reason = validate_parameter(param, value)
-                        all_statuses[param] = {'value': value, 'status': status, 'reason': reason}
-
-                        if status == 'pending_approval' and overall_status == 'accepted':
-                            overall_status = 'pending_approval'
-                        elif status == 'rejected':
-                            overall_status = 'rejected'
-                            rejection_reasons.append(f"{param}: {reason}")
-
-                    if overall_status == 'rejected':
-                        st.error("❌ Submission rejected:")
-                        for reason in rejection_reasons:
-                            st.write(f"- {reason}")
-                    else:
-                        # Save submission
-                        submission_id = len(st.session_state.submissions_df) + 1
-                        new_submission = {
-                            'submission_id': submission_id,
-                            'technician_id': st.session_state.username,
-                            'technician_name': user_info['name'],
-                            'customer_id': final_customer_id,
-                            'customer_name': customer_name,
-                            'test_type': test_type,
-                            'parameters': json.dumps(all_statuses),
-                            'timestamp': datetime.now(),
-                            'status': overall_status,
-                            'approval_notes': '',
-                            'approved_by': ''
-                        }
-
-                        st.session_state.submissions_df = pd.concat([
-                            st.session_state.submissions_df,
-                            pd.DataFrame([new_submission])
-                        ], ignore_index=True)
-
-                        if overall_status == 'accepted':
-                            st.success("✅ Submission accepted and saved!")
-                        else:
-                            st.warning("⚠️ Submission saved but requires manager approval.")
+            submitted = st.form_submit_button("Submit Test Results", use_container_width=True)
 
-                        st.rerun()
+        # Submission
+        if submitted:
+            if all(v is not None and v > 0 for v in parameter_values.values()):
+                all_statuses, overall_status, rejection_reasons = validate_readings(parameter_values)
+
+                if overall_status == 'rejected':
+                    st.error("❌ Submission rejected:")
+                    for reason in rejection_reasons:
+                        st.write(f"- {reason}")
                 else:
-                    st.error("Please enter all parameter values")
+                    # Save submission
+                    new_submission = {
+                        'technician_id': st.session_state.username,
+                        'technician_name': user_info['name'],
+                        'customer_id': final_customer_id,
+                        'customer_name': customer_name,
+                        'test_type': test_type,
+                        'timestamp': datetime.now(),
+                        'status': overall_status,
+                        'catalog_version': CATALOG.version,
+                        'approval_notes': '',
+                        'approved_by': ''
+                    }
+
+                    get_store().add_submission(new_submission, all_statuses)
+
+                    if overall_status == 'accepted':
+                        st.success("✅ Submission accepted and saved!")
+                    else:
+                        st.warning("⚠️ Submission saved but requires manager approval.")
+
+                    st.rerun()
+            else:
+                st.error("Please enter all parameter values")
+
+
+# Offline capture
+OFFLINE_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'components', 'offline_capture')
+OFFLINE_ACK_LIMIT = 500
+
+
+@st.cache_resource
+def get_offline_capture_component():
+    """Browser-side capture queue, see components/offline_capture/index.html"""
+    import streamlit.components.v1 as components
+    return components.declare_component('offline_capture', path=OFFLINE_COMPONENT_DIR)
+
+
+def sync_offline_entries(store, entries, technician_id, technician_name, assigned_customers, catalog):
+    """Re-validate and store a batch of offline-captured entries and return {client_id: ack}"""
+    acks, batch, client_statuses = {}, [], {}
+    now = datetime.now()
+    for entry in entries:
+        client_id = str(entry.get('client_id') or '')
+        if not client_id:
+            continue
+        customer_id = entry.get('customer_id')
+        test_type = entry.get('test_type')
+        if customer_id not in assigned_customers:
+            acks[client_id] = {'state': 'rejected', 'message': 'Customer ID not assigned to you or invalid'}
+            continue
+        if test_type not in TEST_TYPES:
+            acks[client_id] = {'state': 'rejected', 'message': f'Unknown test type: {test_type}'}
+            continue
+
+        params = catalog.basic_params if test_type == 'Basic Test' else catalog.full_suite_params
+        try:
+            values = {param: float(entry['values'][param]) for param in params}
+        except (KeyError, TypeError, ValueError):
+            values = {}
+        if not values or not all(v > 0 for v in values.values()):
+            acks[client_id] = {'state': 'rejected', 'message': 'Missing parameter values'}
+            continue
+
+        readings, overall_status, rejection_reasons = validate_readings(values, catalog.ranges)
+        if overall_status == 'rejected':
+            acks[client_id] = {'state': 'rejected', 'message': '; '.join(rejection_reasons)}
+            continue
+
+        try:
+            captured_at = min(datetime.strptime(str(entry.get('captured_at')), TIMESTAMP_FORMAT), now)
+        except ValueError:
+            captured_at = now
+        fingerprint = hashlib.sha256(json.dumps(
+            [customer_id, test_type, values, captured_at.strftime(TIMESTAMP_FORMAT)], sort_keys=True
+        ).encode()).hexdigest()
+        batch.append((client_id, fingerprint, {
+            'technician_id': technician_id,
+            'technician_name': technician_name,
+            'customer_id': customer_id,
+            'customer_name': CUSTOMER_NAMES.get(customer_id, "Unknown Customer"),
+            'test_type': test_type,
+            'timestamp': captured_at,
+            'status': overall_status,
+            'catalog_version': catalog.version,
+        }, readings))
+        client_statuses[client_id] = (overall_status, entry.get('status'))
+
+    for client_id, (submission_id, outcome) in store.add_client_submissions(batch).items() if batch else []:
+        status, client_status = client_statuses[client_id]
+        if outcome == 'conflict':
+            acks[client_id] = {'state': 'conflict', 'submission_id': submission_id,
+                               'message': f'A different submission (#{submission_id}) was already synced with this id'}
+        elif outcome == 'duplicate':
+            acks[client_id] = {'state': 'synced', 'submission_id': submission_id, 'status': status,
+                               'message': f'Already synced as #{submission_id}'}
+        elif status != client_status:
+            acks[client_id] = {'state': 'reclassified', 'submission_id': submission_id, 'status': status,
+                               'message': f"Saved as #{submission_id}, {status.replace('_', ' ')} "
+                                          f"under catalog version {catalog.version}"}
+        else:
+            acks[client_id] = {'state': 'synced', 'submission_id': submission_id, 'status': status,
+                               'message': f"Saved as #{submission_id} ({status.replace('_', ' ')})"}
+    return acks
+
+
+def offline_capture_form(user_info):
+    """Capture samples in the browser and sync them in batches when the server is reachable"""
+    st.caption("Readings are checked and queued on this device, so capture keeps working without a "
+               "connection. Queued samples are sent together whenever the server can be reached.")
+
+    # Store the batch the browser sent with the previous interaction, once per batch
+    acks = st.session_state.setdefault('offline_acks', {})
+    batch = st.session_state.get('offline_capture')
+    if batch and batch.get('batch_id') != st.session_state.get('offline_batch_id'):
+        st.session_state.offline_batch_id = batch['batch_id']
+        acks.update(sync_offline_entries(
+            get_store(), batch.get('entries', []), st.session_state.username, user_info['name'],
+            REGISTRY.customers_by_technician[st.session_state.username], CATALOG
+        ))
+        for client_id in list(acks)[:max(0, len(acks) - OFFLINE_ACK_LIMIT)]:
+            del acks[client_id]
+
+    get_offline_capture_component()(
+        technician=st.session_state.username,
+        customers=[[c, CUSTOMER_NAMES.get(c, "Unknown Customer")]
+                   for c in REGISTRY.technician_customers[st.session_state.username]],
+        test_types=TEST_TYPES,
+        catalog={'version': CATALOG.version, 'ranges': CATALOG.ranges,
+                 'basic_params': CATALOG.basic_params, 'full_suite_params': CATALOG.full_suite_params},
+        acks=acks,
+        key='offline_capture',
+        default=None,
+    )
+
+
+# Views
+VIEW_CACHE_ENTRIES = 256
+
+
+def lazy_tabs(labels, key):
+    """Tab strip that returns the selected label, so callers render only the selected view"""
+    return st.radio("Section", labels, horizontal=True, key=key, label_visibility='collapsed')
+
+
+class ViewModelCache:
+    """Data behind each view, shared by every session and rebuilt when its version changes"""
+
+    def __init__(self, max_entries=VIEW_CACHE_ENTRIES):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        """Return the value cached under key for version, calling build() on a miss"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                return cached[1]
+        value = build()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+@st.cache_resource
+def get_view_models():
+    """View model cache shared by every session"""
+    return ViewModelCache()
+
+
+# Change feed
+FEED_BATCH = 1000
+FEED_RESET_EVENTS = 20000  # further behind than this, drop every view instead of replaying
+
+
+class ChangeFeed:
+    """This process's position in the store's event feed, bumping each scope a change touches; one host only"""
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self.position = store.latest_event()
+        self._epoch = 0
+        self._versions = {}
+
+    def poll(self):
+        """Apply the events appended since the last poll and return the new position"""
+        with self._lock:
+            events = self._store.events_since(self.position, FEED_BATCH)
+            if not events and self._store.latest_event() < self.position:
+                # The store was replaced by one with a shorter history
+                self._epoch += 1
+                self._versions.clear()
+                self.position = self._store.latest_event()
+            if len(events) == FEED_BATCH:
+                latest = self._store.latest_event()
+                if latest - self.position > FEED_RESET_EVENTS:
+                    self._epoch += 1
+                    self._versions.clear()
+                    self.position = latest
+                    return self.position
+            while events:
+                for event in events:
+                    scopes = [('all',), ('technician', event.technician_id), ('customer', event.customer_id),
+                              ('status', event.new_status)]
+                    if event.old_status is not None and event.old_status != event.new_status:
+                        scopes.append(('status', event.old_status))
+                    for scope in scopes:
+                        self._versions[scope] = self._versions.get(scope, 0) + 1
+                self.position = events[-1].seq
+                if len(events) < FEED_BATCH:
+                    break
+                events = self._store.events_since(self.position, FEED_BATCH)
+            return self.position
+
+    def version(self, *scope):
+        """Version of a scope as of the last poll, e.g. version('technician', 'tech1')"""
+        with self._lock:
+            return self._epoch, self._versions.get(scope, 0)
+
+
+@st.cache_resource
+def get_change_feed():
+    """Change feed follower shared by every session of this process"""
+    return ChangeFeed(get_store())
+
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+
+def pagination_controls(key, total_rows):
+    """Render page size and page pickers and return (limit, offset) for the current page"""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZE_OPTIONS, key=f"{key}_page_size")
+    page_count = max(1, -(-total_rows // page_size))
+    # Filters may have shrunk the result set since the page was picked
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key=f"{key}_page")
+    with col3:
+        st.caption(f"{total_rows} submissions - page {page} of {page_count}")
+    return page_size, (page - 1) * page_size
+
+
+def selected_summary_row(page_df, columns, labels, key):
+    """Show a page as a compact table and return the row the user selected, if any"""
+    display_df = page_df[columns].copy()
+    display_df['timestamp'] = display_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+    display_df.columns = labels
+    event = st.dataframe(display_df, use_container_width=True, hide_index=True,
+                         on_select="rerun", selection_mode="single-row", key=key)
+    if event.selection.rows:
+        return page_df.iloc[event.selection.rows[0]]
+    st.caption("Select a row to see its details")
+    return None
+
+
+def submission_details(row, params):
+    """Technician view of one submission and its readings"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write(f"**Customer:** {row['customer_name']}")
+        st.write(f"**Test Type:** {row['test_type']}")
+    with col2:
+        st.write(f"**Date:** {row['timestamp'].strftime('%Y-%m-%d %H:%M')}")
+        st.write(f"**Status:** {row['status']}")
+        st.write(f"**Catalog Version:** {row['catalog_version']}")
+    with col3:
+        if row['status'] == 'rejected':
+            if st.button(f"Edit & Resubmit #{row['submission_id']}",
+                         key=f"edit_{row['submission_id']}"):
+                st.session_state.editing_submission = row['submission_id']
+
+    if st.session_state.get('editing_submission') == row['submission_id']:
+        resubmit_form(row, params)
+        return
+
+    # Show parameters
+    for param, value, status in zip(params['param'], params['value'], params['status']):
+        param_label = param.replace('_', ' ').title()
+        unit = parameter_info(param)['unit']
+        status_class = f"status-{status.replace('_', '-')}"
+        st.markdown(f"**{param_label}:** {value:g} {unit} "
+                    f'<span class="{status_class}">{status}</span>',
+                    unsafe_allow_html=True)
+
+
+def resubmit_form(row, params):
+    """Edit a rejected submission's readings and send it through validation again"""
+    submission_id = row['submission_id']
+    previous = dict(zip(params['param'], params['value']))
+    test_params = BASIC_PARAMS if row['test_type'] == "Basic Test" else FULL_SUITE_PARAMS
+    parameter_values = {}
+
+    with st.form(f"resubmit_{submission_id}", border=False):
+        cols = st.columns(2)
+        for i, param in enumerate(test_params):
+            with cols[i % 2]:
+                param_info = PARAMETER_RANGES[param]
+                acceptable_min, acceptable_max = param_info['acceptable']
+                parameter_values[param] = st.number_input(
+                    f"{param.replace('_', ' ').title()} ({param_info['unit']})",
+                    min_value=0.0,
+                    value=float(previous[param]) if param in previous else None,
+                    step=0.1,
+                    key=f"resubmit_{submission_id}_{param}",
+                    placeholder=f"{acceptable_min}–{acceptable_max}"
+                )
+
+        col_submit, col_cancel = st.columns(2)
+        with col_submit:
+            submitted = st.form_submit_button("Resubmit", use_container_width=True)
+        with col_cancel:
+            cancelled = st.form_submit_button("Cancel", use_container_width=True)
+
+    if cancelled:
+        del st.session_state.editing_submission
+        st.rerun()
+    if not submitted:
+        return
+    if not all(v is not None and v > 0 for v in parameter_values.values()):
+        st.error("Please enter all parameter values")
+        return
+
+    all_statuses, overall_status, rejection_reasons = validate_readings(parameter_values)
+    if overall_status == 'rejected':
+        st.error("❌ Submission rejected:")
+        for reason in rejection_reasons:
+            st.write(f"- {reason}")
+        return
+
+    try:
+        get_store().resubmit(submission_id, row['version'], st.session_state.username, overall_status,
+                             all_statuses, CATALOG.version)
+    except StaleSubmissionError as e:
+        del st.session_state.editing_submission
+        st.error(f"❌ {e}")
+        return
+    del st.session_state.editing_submission
+    st.rerun()
+
+
+def pending_approval_details(row, params, user_info):
+    """Manager view of one pending submission with approve/reject actions"""
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.write(f"**Technician:** {row['technician_name']}")
+        st.write(f"**Customer:** {row['customer_name']}")
+        st.write(f"**Test Type:** {row['test_type']}")
+        st.write(f"**Date:** {row['timestamp'].strftime('%Y-%m-%d %H:%M')}")
+
+        # Show parameters needing approval
+        for param, value, reason in zip(params['param'], params['value'], params['reason']):
+            param_label = param.replace('_', ' ').title()
+            unit = parameter_info(param)['unit']
+            st.warning(f"**{param_label}:** {value:g} {unit} - {reason}")
+
+    with col2:
+        notes = st.text_area(f"Notes", key=f"notes_{row['submission_id']}")
+
+        col_approve, col_reject = st.columns(2)
+        with col_approve:
+            if st.button("✅ Approve", key=f"approve_{row['submission_id']}", use_container_width=True):
+                decide_submission(row, 'accepted', notes, user_info['name'])
+
+        with col_reject:
+            if st.button("❌ Reject", key=f"reject_{row['submission_id']}", use_container_width=True):
+                decide_submission(row, 'rejected', notes, user_info['name'])
+
+
+def decide_submission(row, status, notes, approved_by):
+    """Record a manager decision on the version shown, or report that someone else changed it first"""
+    try:
+        get_store().update_status(row['submission_id'], row['version'], status, notes, approved_by)
+    except StaleSubmissionError as e:
+        st.session_state.approval_conflict = str(e)
+    else:
+        verb = 'approved' if status == 'accepted' else 'rejected'
+        st.success(f"Submission #{row['submission_id']} {verb}!")
+    st.rerun()
+
+
+@profiled('technician_interface', section_key='technician_section')
+def technician_interface():
+    """Lab Technician Interface"""
+    st.markdown('<div class="main-header"><h1>🔬 Lab Technician Interface</h1></div>', unsafe_allow_html=True)
+
+    user_info = USERS[st.session_state.username]
+    st.write(f"Welcome, **{user_info['name']}**")
+
+    section = lazy_tabs(["New Submission", "Submission History"], key='technician_section')
 
-    with tab2:
+    if section == "New Submission":
+        st.subheader("New Test Submission")
+
+        entry_mode = st.radio("Entry Mode", ["Single Sample", "Offline Queue", "Bulk Upload"], horizontal=True)
+        if entry_mode == "Bulk Upload":
+            bulk_upload_form(user_info)
+        elif entry_mode == "Offline Queue":
+            offline_capture_form(user_info)
+        else:
+            single_sample_form(user_info)
+
+    else:
         st.subheader("Submission History")
 
         # Filters
         col1, col2 = st.columns(2)
         with col1:
-            customer_filter = st.selectbox("Filter by Customer", ['All'] + user_info['customers'])
+            customer_filter = st.selectbox("Filter by Customer",
+                                           ['All'] + list(REGISTRY.technician_customers[st.session_state.username]))
         with col2:
             date_filter = st.date_input("Filter by Date", value=None)
 
-        # Get technician's submissions
-        tech_submissions = st.session_state.submissions_df[
-            st.session_state.submissions_df['technician_id'] == st.session_state.username
-            ].copy()
-
-        # Apply filters
-        if customer_filter != 'All':
-            tech_submissions = tech_submissions[tech_submissions['customer_id'] == customer_filter]
-
-        if date_filter:
-            tech_submissions = tech_submissions[
-                tech_submissions['timestamp'].dt.date == date_filter
-                ]
-
-        if not tech_submissions.empty:
-            # Display submissions
-            for _, row in tech_submissions.iterrows():
-                with st.expander(
-                        f"Submission #{row['submission_id']} - {row['customer_name']} - {row['status'].upper()}"):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write(f"**Customer:** {row['customer_name']}")
-                        st.write(f"**Test Type:** {row['test_type']}")
-                    with col2:
-                        st.write(f"**Date:** {row['timestamp'].strftime('%Y-%m-%d %H:%M')}")
-                        st.write(f"**Status:** {row['status']}")
-                    with col3:
-                        if row['status'] == 'rejected':
-                            if st.button(f"Edit & Resubmit #{row['submission_id']}",
-                                         key=f"edit_{row['submission_id']}"):
-                                st.info("Edit functionality would be implemented here")
-
-                    # Show parameters
-                    params = json.loads(row['parameters'])
-                    for param, details in params.items():
-                        param_label = param.replace('_', ' ').title()
-                        unit = PARAMETER_RANGES[param]['unit']
-                        status_class = f"status-{details['status'].replace('_', '-')}"
-                        st.markdown(f"**{param_label}:** {details['value']} {unit} "
-                                    f'<span class="{status_class}">{details["status"]}</span>',
-                                    unsafe_allow_html=True)
+        # Get one page of the technician's submissions matching the filters
+        filters = dict(
+            technician_id=st.session_state.username,
+            customer_id=customer_filter if customer_filter != 'All' else None,
+            day=date_filter or None
+        )
+        store = get_store()
+        history_version = get_change_feed().version('technician', st.session_state.username)
+        total_rows = get_view_models().get(('history_count', *filters.values()), history_version,
+                                           lambda: store.count(**filters))
+
+        if total_rows:
+            view_mode = st.radio("View", ["Compact", "Detailed"], horizontal=True, key='history_view')
+            limit, offset = pagination_controls('history', total_rows)
+            tech_submissions = get_view_models().get(
+                ('history_page', *filters.values(), limit, offset), history_version,
+                lambda: store.query(**filters, limit=limit, offset=offset, newest_first=True)
+            )
+
+            if view_mode == "Compact":
+                row = selected_summary_row(
+                    tech_submissions, ['submission_id', 'customer_name', 'test_type', 'timestamp', 'status'],
+                    ['Submission', 'Customer', 'Test Type', 'Date', 'Status'], key='history_table'
+                )
+                if row is not None:
+                    submission_details(row, get_store().readings(submission_ids=[row['submission_id']]))
+            else:
+                readings_by_submission = get_view_models().get(
+                    ('history_page_readings', *filters.values(), limit, offset), history_version,
+                    lambda: dict(tuple(store.readings(submission_ids=tech_submissions['submission_id'])
+                                       .groupby('submission_id')))
+                )
+
+                # Display submissions
+                for _, row in tech_submissions.iterrows():
+                    with st.expander(
+                            f"Submission #{row['submission_id']} - {row['customer_name']} - {row['status'].upper()}"):
+                        submission_details(row, readings_by_submission.get(
+                            row['submission_id'], pd.DataFrame(columns=READING_COLUMNS)))
         else:
             st.info("No submissions found matching the criteria")
 
 
+def pending_deviation(readings, store=None):
+    """Largest relative distance outside the acceptable range per submission, 0 for readings inside it"""
+    acceptable = {param: parameter_info(param, store).get('acceptable') for param in readings['param'].unique()}
+    acceptable = {param: bounds for param, bounds in acceptable.items() if bounds}
+    readings = readings[readings['param'].isin(list(acceptable))]
+    values = readings['value'].to_numpy()
+    acceptable_min = readings['param'].map({p: bounds[0] for p, bounds in acceptable.items()}).to_numpy('float64')
+    acceptable_max = readings['param'].map({p: bounds[1] for p, bounds in acceptable.items()}).to_numpy('float64')
+    deviation = np.maximum((acceptable_min - values) / np.abs(acceptable_min),
+                           (values - acceptable_max) / np.abs(acceptable_max)).clip(min=0)
+    return pd.Series(deviation, index=readings['submission_id'].to_numpy()).groupby(level=0).max()
+
+
+def select_within_tolerance():
+    """Pre-select every pending submission within the chosen tolerance of its acceptable range"""
+    store = get_store()
+    readings = store.readings(submission_status='pending_approval')
+    deviation = pending_deviation(readings[readings['status'] == 'pending_approval'], store)
+    tolerance = st.session_state.bulk_tolerance / 100
+    st.session_state.bulk_selection = deviation.index[deviation <= tolerance].tolist()
+
+
+def apply_bulk_decision(status, approved_by, labels):
+    """Approve or reject every selected submission, at the version listed, with a single write"""
+    selection = st.session_state.bulk_selection
+    updated = get_store().update_statuses({i: labels[i][1] for i in selection if i in labels}, status,
+                                          st.session_state.bulk_notes, approved_by)
+    verb = 'approved' if status == 'accepted' else 'rejected'
+    st.session_state.bulk_result = f"{updated} submission(s) {verb}!"
+    if updated < len(selection):
+        st.session_state.bulk_result += (f" {len(selection) - updated} skipped: changed by someone else "
+                                         "since the list was loaded.")
+    st.session_state.bulk_selection = []
+
+
+def pending_labels(pending_index):
+    """Multiselect (label, version) for pending submissions, keyed by submission_id"""
+    return dict(zip(pending_index['submission_id'],
+                    zip(pending_index['customer_name'] + ' - ' + pending_index['test_type'],
+                        pending_index['version'])))
+
+
+def bulk_approval_form(labels, user_info):
+    """Multi-select approve/reject for clearing large backlogs"""
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.number_input("Tolerance (% beyond the acceptable range)", min_value=0.0, max_value=100.0,
+                        value=5.0, step=1.0, key='bulk_tolerance')
+    with col2:
+        st.button("Select Within Tolerance", on_click=select_within_tolerance, use_container_width=True)
+
+    st.multiselect("Submissions", options=list(labels), key='bulk_selection',
+                   format_func=lambda submission_id: f"#{submission_id} - {labels[submission_id][0]}")
+    st.text_area("Notes (recorded on every selected submission)", key='bulk_notes')
+
+    col_approve, col_reject = st.columns(2)
+    disabled = not st.session_state.bulk_selection
+    with col_approve:
+        st.button("✅ Approve Selected", on_click=apply_bulk_decision, args=('accepted', user_info['name'], labels),
+                  disabled=disabled, use_container_width=True)
+    with col_reject:
+        st.button("❌ Reject Selected", on_click=apply_bulk_decision, args=('rejected', user_info['name'], labels),
+                  disabled=disabled, use_container_width=True)
+
+
+# Trend charts
+TREND_MAX_POINTS = 1000  # roughly one point per pixel of a full-width chart
+TREND_WEBGL_POINTS = 500
+TREND_WINDOWS = {'All Time': None, 'Last 30 Days': 30, 'Last 90 Days': 90, 'Last Year': 365}
+
+
+def window_series(timestamps, values, days):
+    """Slice time-ordered trend arrays to the last `days` days"""
+    if days is None:
+        return timestamps, values
+    start = np.datetime64(datetime.now() - timedelta(days=days))
+    i = np.searchsorted(timestamps, start, side='left')
+    return timestamps[i:], values[i:]
+
+
+def downsample_series(timestamps, values, max_points=TREND_MAX_POINTS):
+    """Min/max bucket a series to at most max_points points plus its endpoints, keeping every excursion"""
+    n = len(values)
+    if n <= max_points:
+        return timestamps, values
+    buckets = max_points // 2
+    starts = np.linspace(0, n, buckets, endpoint=False).astype('intp')
+    ends = np.append(starts[1:], n)
+    bucket_of = np.repeat(np.arange(buckets), ends - starts)
+    order = np.lexsort((values, bucket_of))
+    keep = np.unique(np.concatenate([[0, n - 1], order[starts], order[ends - 1]]))
+    return timestamps[keep], values[keep]
+
+
+@profiled('trend_figure')
+def trend_figure(param, timestamps, values):
+    """Line chart of a downsampled trend, drawn with WebGL for long series"""
+    import plotly.express as px
+    timestamps, values = downsample_series(timestamps, values)
+    return px.line(x=timestamps, y=values,
+                   title=f"{param.replace('_', ' ').title()} Trend",
+                   labels={'x': 'Date', 'y': f"{param} ({parameter_info(param)['unit']})"},
+                   render_mode='webgl' if len(values) > TREND_WEBGL_POINTS else 'svg')
+
+
+def diagnostics_panel():
+    """Manager view of the instrumentation: timings, slowest sampled reruns and a metrics export"""
+    st.subheader("Diagnostics")
+    st.caption(f"Since {datetime.fromtimestamp(INSTRUMENTATION.started).strftime('%Y-%m-%d %H:%M:%S')} · "
+               f"{INSTRUMENTATION.sample_rate:.0%} of reruns profiled")
+
+    timings = INSTRUMENTATION.timings()
+    if timings.empty:
+        st.info("No timings recorded yet")
+    else:
+        display_df = timings.copy()
+        for column in ['mean_s', 'max_s']:
+            display_df[column.replace('_s', '_ms')] = (display_df.pop(column) * 1000).round(1)
+        display_df['total_s'] = display_df['total_s'].round(2)
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download Prometheus Metrics", data=INSTRUMENTATION.prometheus(),
+                           file_name="inoa_metrics.prom", mime="text/plain", use_container_width=True)
+    with col2:
+        if st.button("Reset Timings", use_container_width=True):
+            INSTRUMENTATION.reset()
+            st.rerun()
+
+    st.write("**Slowest Sampled Reruns**")
+    captures = INSTRUMENTATION.captures()
+    if not captures:
+        st.info("No reruns profiled yet")
+    for seconds, captured_at, label, stats in captures:
+        with st.expander(f"{seconds * 1000:.0f} ms · {label} · "
+                         f"{datetime.fromtimestamp(captured_at).strftime('%H:%M:%S')}"):
+            st.code(stats, language=None)
+
+
+@profiled('manager_interface', section_key='manager_section')
 def manager_interface():
     """Lab Manager Interface"""
     st.markdown('<div class="main-header"><h1>👨‍💼 Lab Manager Interface</h1></div>', unsafe_allow_html=True)
@@ -348,106 +2262,105 @@ def manager_interface():
     user_info = USERS[st.session_state.username]
     st.write(f"Welcome, **{user_info['name']}**")
 
-    tab1, tab2, tab3 = st.tabs(["Approval Dashboard", "All Submissions", "Customer Health"])
+    sections = ["Approval Dashboard", "All Submissions", "Customer Health"]
+    section = lazy_tabs(sections + ["Diagnostics"] if INSTRUMENTATION else sections, key='manager_section')
+    store = get_store()
+    data_version = get_change_feed().version('all')
+    pending_version = get_change_feed().version('status', 'pending_approval')
 
-    with tab1:
+    if section == "Approval Dashboard":
         st.subheader("Pending Approvals")
 
-        pending_submissions = st.session_state.submissions_df[
-            st.session_state.submissions_df['status'] == 'pending_approval'
-            ].copy()
-
-        if not pending_submissions.empty:
-            for _, row in pending_submissions.iterrows():
-                with st.expander(f"Submission #{row['submission_id']} - {row['customer_name']} - Pending Approval"):
-                    col1, col2 = st.columns([2, 1])
-
-                    with col1:
-                        st.write(f"**Technician:** {row['technician_name']}")
-                        st.write(f"**Customer:** {row['customer_name']}")
-                        st.write(f"**Test Type:** {row['test_type']}")
-                        st.write(f"**Date:** {row['timestamp'].strftime('%Y-%m-%d %H:%M')}")
-
-                        # Show parameters needing approval
-                        params = json.loads(row['parameters'])
-                        for param, details in params.items():
-                            if details['status'] == 'pending_approval':
-                                param_label = param.replace('_', ' ').title()
-                                unit = PARAMETER_RANGES[param]['unit']
-                                st.warning(f"**{param_label}:** {details['value']} {unit} - {details['reason']}")
-
-                    with col2:
-                        notes = st.text_area(f"Notes", key=f"notes_{row['submission_id']}")
-
-                        col_approve, col_reject = st.columns(2)
-                        with col_approve:
-                            if st.button("✅ Approve", key=f"approve_{row['submission_id']}", use_container_width=True):
-                                # Update submission status
-                                idx = st.session_state.submissions_df[
-                                    st.session_state.submissions_df['submission_id'] == row['submission_id']
-                                    ].index[0]
-
-                                st.session_state.submissions_df.loc[idx, 'status'] = 'accepted'
-                                st.session_state.submissions_df.loc[idx, 'approval_notes'] = notes
-                                st.session_state.submissions_df.loc[idx, 'approved_by'] = user_info['name']
-
-                                st.success(f"Submission #{row['submission_id']} approved!")
-                                st.rerun()
-
-                        with col_reject:
-                            if st.button("❌ Reject", key=f"reject_{row['submission_id']}", use_container_width=True):
-                                idx = st.session_state.submissions_df[
-                                    st.session_state.submissions_df['submission_id'] == row['submission_id']
-                                    ].index[0]
-
-                                st.session_state.submissions_df.loc[idx, 'status'] = 'rejected'
-                                st.session_state.submissions_df.loc[idx, 'approval_notes'] = notes
-                                st.session_state.submissions_df.loc[idx, 'approved_by'] = user_info['name']
-
-                                st.success(f"Submission #{row['submission_id']} rejected!")
-                                st.rerun()
+        if 'bulk_result' in st.session_state:
+            st.success(st.session_state.pop('bulk_result'))
+        if 'approval_conflict' in st.session_state:
+            st.error(f"❌ {st.session_state.pop('approval_conflict')}")
+
+        total_pending = get_view_models().get(('pending_count',), pending_version,
+                                              lambda: store.count(status='pending_approval'))
+
+        if total_pending:
+            with st.expander("Bulk Actions"):
+                bulk_approval_form(get_view_models().get(
+                    ('pending_labels',), pending_version, lambda: pending_labels(store.query(status='pending_approval'))
+                ), user_info)
+
+            view_mode = st.radio("View", ["Compact", "Detailed"], horizontal=True, key='approval_view')
+            limit, offset = pagination_controls('approvals', total_pending)
+            pending_submissions = get_view_models().get(
+                ('pending_page', limit, offset), pending_version,
+                lambda: store.query(status='pending_approval', limit=limit, offset=offset)
+            )
+
+            def pending_readings(submission_ids):
+                readings = get_store().readings(submission_ids=submission_ids)
+                return readings[readings['status'] == 'pending_approval']
+
+            if view_mode == "Compact":
+                row = selected_summary_row(
+                    pending_submissions, ['submission_id', 'technician_name', 'customer_name', 'test_type', 'timestamp'],
+                    ['Submission', 'Technician', 'Customer', 'Test Type', 'Date'], key='approval_table'
+                )
+                if row is not None:
+                    pending_approval_details(row, pending_readings([row['submission_id']]), user_info)
+            else:
+                pending_by_submission = get_view_models().get(
+                    ('pending_page_readings', limit, offset), pending_version,
+                    lambda: dict(tuple(pending_readings(pending_submissions['submission_id']).groupby('submission_id')))
+                )
+
+                for _, row in pending_submissions.iterrows():
+                    with st.expander(f"Submission #{row['submission_id']} - {row['customer_name']} - Pending Approval"):
+                        pending_approval_details(row, pending_by_submission.get(
+                            row['submission_id'], pd.DataFrame(columns=READING_COLUMNS)), user_info)
         else:
             st.info("No pending approvals")
 
-    with tab2:
+    elif section == "All Submissions":
         st.subheader("All Submissions")
 
         # Filters
         col1, col2, col3 = st.columns(3)
         with col1:
             tech_filter = st.selectbox("Filter by Technician",
-                                       ['All'] + [k for k, v in USERS.items() if v['role'] == 'technician'])
+                                       ['All'] + REGISTRY.users_by_role.get('technician', []))
         with col2:
             customer_filter = st.selectbox("Filter by Customer", ['All'] + list(CUSTOMER_NAMES.keys()))
         with col3:
             status_filter = st.selectbox("Filter by Status", ['All', 'accepted', 'pending_approval', 'rejected'])
 
-        # Filter data
-        filtered_df = st.session_state.submissions_df.copy()
-
-        if tech_filter != 'All':
-            filtered_df = filtered_df[filtered_df['technician_id'] == tech_filter]
-        if customer_filter != 'All':
-            filtered_df = filtered_df[filtered_df['customer_id'] == customer_filter]
-        if status_filter != 'All':
-            filtered_df = filtered_df[filtered_df['status'] == status_filter]
+        filters = dict(
+            technician_id=tech_filter if tech_filter != 'All' else None,
+            customer_id=customer_filter if customer_filter != 'All' else None,
+            status=status_filter if status_filter != 'All' else None
+        )
+        counts, daily = get_view_models().get(
+            ('overview', *filters.values()), data_version,
+            lambda: (store.status_counts(**filters), store.daily_counts(**filters))
+        )
+        total_rows = sum(counts.values())
 
         # Display summary metrics
-        if not filtered_df.empty:
+        if total_rows:
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total Submissions", len(filtered_df))
+                st.metric("Total Submissions", total_rows)
             with col2:
-                accepted_count = len(filtered_df[filtered_df['status'] == 'accepted'])
-                st.metric("Accepted", accepted_count)
+                st.metric("Accepted", counts.get('accepted', 0))
             with col3:
-                pending_count = len(filtered_df[filtered_df['status'] == 'pending_approval'])
-                st.metric("Pending", pending_count)
+                st.metric("Pending", counts.get('pending_approval', 0))
             with col4:
-                rejected_count = len(filtered_df[filtered_df['status'] == 'rejected'])
-                st.metric("Rejected", rejected_count)
+                st.metric("Rejected", counts.get('rejected', 0))
 
-            # Display table
+            st.write("**Daily Throughput**")
+            st.bar_chart(daily)
+
+            # Display one page of the table
+            limit, offset = pagination_controls('all_submissions', total_rows)
+            filtered_df = get_view_models().get(
+                ('submissions_page', *filters.values(), limit, offset), data_version,
+                lambda: store.query(**filters, limit=limit, offset=offset, newest_first=True)
+            )
             display_df = filtered_df[['submission_id', 'technician_name', 'customer_name',
                                       'test_type', 'timestamp', 'status']].copy()
             display_df['timestamp'] = display_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
@@ -455,63 +2368,89 @@ def manager_interface():
         else:
             st.info("No submissions found")
 
-    with tab3:
+        st.write("**Export**")
+        if st.button("📄 Export All Customer Reports", use_container_width=True):
+            store = get_store()
+            st.session_state.all_reports_job = get_report_jobs().submit(
+                ('all_customers', data_version), generate_all_reports, store
+            )
+
+        if 'all_reports_job' in st.session_state:
+            report_download('all_reports_job', "Download All Reports (ZIP)",
+                            f"lab_reports_{datetime.now().strftime('%Y%m%d')}.zip", "application/zip")
+
+        st.write("**Parameter Catalog**")
+        outdated = get_view_models().get(('outdated', CATALOG.version), data_version,
+                                         lambda: store.count_outdated(CATALOG.version))
+        st.write(f"Current version: **{CATALOG.version}** · "
+                 f"{outdated} submission(s) validated against another version")
+        if outdated and st.button("🔁 Re-validate History", use_container_width=True):
+            store = get_store()
+            st.session_state.revalidate_job = get_report_jobs().submit(
+                ('revalidate', CATALOG.version, data_version), store.revalidate, CATALOG
+            )
+
+        if 'revalidate_job' in st.session_state:
+            revalidation_status('revalidate_job')
+
+    elif section == "Customer Health":
         st.subheader("Customer Health Monitoring")
 
         customer_search = st.selectbox("Select Customer", [''] + list(CUSTOMER_NAMES.keys()))
 
         if customer_search:
-            customer_data = st.session_state.submissions_df[
-                (st.session_state.submissions_df['customer_id'] == customer_search) &
-                (st.session_state.submissions_df['status'] == 'accepted')
-                ].copy()
+            # Only the accepted-submission count and the latest ten rows are shown
+            total_tests, recent = get_view_models().get(
+                ('customer_health', customer_search), get_change_feed().version('customer', customer_search),
+                lambda: (store.count(customer_id=customer_search, status='accepted'),
+                         store.query(customer_id=customer_search, status='accepted', limit=10,
+                                     newest_first=True).iloc[::-1])
+            )
 
-            if not customer_data.empty:
+            if total_tests:
                 st.write(f"**Customer:** {CUSTOMER_NAMES[customer_search]}")
-                st.write(f"**Total Tests:** {len(customer_data)}")
-
-                # Show trends
-                customer_data_sorted = customer_data.sort_values('timestamp')
+                st.write(f"**Total Tests:** {total_tests}")
 
                 # Parameter trends
-                if len(customer_data_sorted) > 1:
+                if total_tests > 1:
                     st.subheader("Parameter Trends")
 
+                    window = st.selectbox("Time Window", list(TREND_WINDOWS), key='health_window')
+
                     # Create trend charts for key parameters
+                    customer_series = get_store().customer_series(customer_search)
                     for param in BASIC_PARAMS:
-                        param_values = []
-                        dates = []
-
-                        for _, row in customer_data_sorted.iterrows():
-                            params = json.loads(row['parameters'])
-                            if param in params:
-                                param_values.append(params[param]['value'])
-                                dates.append(row['timestamp'])
+                        if param not in customer_series:
+                            continue
+                        dates, param_values, _ = customer_series[param]
+                        dates, param_values = window_series(dates, param_values, TREND_WINDOWS[window])
 
                         if len(param_values) > 1:
-                            fig = px.line(x=dates, y=param_values,
-                                          title=f"{param.replace('_', ' ').title()} Trend",
-                                          labels={'x': 'Date', 'y': f"{param} ({PARAMETER_RANGES[param]['unit']})"})
+                            fig = trend_figure(param, dates, param_values)
 
                             # Add acceptable range bands
-                            acceptable_min, acceptable_max = PARAMETER_RANGES[param]['acceptable']
-                            fig.add_hline(y=acceptable_min, line_dash="dash", line_color="green",
-                                          annotation_text="Min Acceptable")
-                            fig.add_hline(y=acceptable_max, line_dash="dash", line_color="green",
-                                          annotation_text="Max Acceptable")
+                            acceptable = parameter_info(param).get('acceptable')
+                            if acceptable:
+                                fig.add_hline(y=acceptable[0], line_dash="dash", line_color="green",
+                                              annotation_text="Min Acceptable")
+                                fig.add_hline(y=acceptable[1], line_dash="dash", line_color="green",
+                                              annotation_text="Max Acceptable")
 
                             st.plotly_chart(fig, use_container_width=True)
 
                 # Recent submissions table
                 st.subheader("Recent Submissions")
-                recent_df = customer_data_sorted.tail(10)[
-                    ['submission_id', 'test_type', 'timestamp', 'technician_name']]
+                recent_df = recent[['submission_id', 'test_type', 'timestamp', 'technician_name']].copy()
                 recent_df['timestamp'] = recent_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
                 st.dataframe(recent_df, use_container_width=True)
             else:
                 st.info("No accepted submissions found for this customer")
 
+    else:
+        diagnostics_panel()
+
 
+@profiled('customer_interface')
 def customer_interface():
     """Customer Interface"""
     st.markdown('<div class="main-header"><h1>📊 Customer Portal</h1></div>', unsafe_allow_html=True)
@@ -521,10 +2460,10 @@ def customer_interface():
     st.write(f"Welcome, **{user_info['name']}**")
 
     # Get customer's approved data only
-    customer_data = st.session_state.submissions_df[
-        (st.session_state.submissions_df['customer_id'] == customer_id) &
-        (st.session_state.submissions_df['status'] == 'accepted')
-        ].copy()
+    customer_data = get_view_models().get(
+        ('customer_submissions', customer_id), get_change_feed().version('customer', customer_id),
+        lambda: get_store().query(customer_id=customer_id, status='accepted')
+    )
 
     if not customer_data.empty:
         # Summary metrics
@@ -543,8 +2482,13 @@ def customer_interface():
 
         # Sort by timestamp, most recent first
         customer_data_sorted = customer_data.sort_values('timestamp', ascending=False)
+        recent = customer_data_sorted.head(5)
+        recent_readings = get_store().readings(submission_ids=recent['submission_id'])
+        readings_by_submission = dict(tuple(
+            recent_readings[recent_readings['status'] == 'accepted'].groupby('submission_id')
+        ))
 
-        for _, row in customer_data_sorted.head(5).iterrows():
+        for _, row in recent.iterrows():
             with st.expander(
                     f"Test #{row['submission_id']} - {row['test_type']} - {row['timestamp'].strftime('%Y-%m-%d')}"):
                 col1, col2 = st.columns(2)
@@ -554,65 +2498,57 @@ def customer_interface():
                 with col2:
                     st.write(f"**Technician:** {row['technician_name']}")
 
-                # Display parameters
-                params = json.loads(row['parameters'])
+                # Display parameters (only accepted readings)
+                params = readings_by_submission.get(row['submission_id'], pd.DataFrame(columns=READING_COLUMNS))
                 param_cols = st.columns(2)
-                col_idx = 0
-
-                for param, details in params.items():
-                    if details['status'] == 'accepted':  # Only show accepted parameters
-                        param_label = param.replace('_', ' ').title()
-                        unit = PARAMETER_RANGES[param]['unit']
 
-                        with param_cols[col_idx % 2]:
-                            # Color code based on acceptable range
-                            acceptable_min, acceptable_max = PARAMETER_RANGES[param]['acceptable']
-                            value = details['value']
+                for col_idx, (param, value) in enumerate(zip(params['param'], params['value'])):
+                    param_label = param.replace('_', ' ').title()
+                    info = parameter_info(param)
+                    unit = info['unit']
 
-                            if acceptable_min <= value <= acceptable_max:
-                                st.success(f"**{param_label}:** {value} {unit}")
-                            else:
-                                st.warning(f"**{param_label}:** {value} {unit}")
+                    with param_cols[col_idx % 2]:
+                        # Color code based on acceptable range; removed parameters have none to compare against
+                        acceptable = info.get('acceptable')
 
-                        col_idx += 1
+                        if acceptable is None:
+                            st.info(f"**{param_label}:** {value:g} {unit}")
+                        elif acceptable[0] <= value <= acceptable[1]:
+                            st.success(f"**{param_label}:** {value:g} {unit}")
+                        else:
+                            st.warning(f"**{param_label}:** {value:g} {unit}")
 
         # Parameter trends
         if len(customer_data_sorted) > 1:
             st.subheader("Parameter Trends")
 
             # Let customer select which parameter to view
-            available_params = set()
-            for _, row in customer_data_sorted.iterrows():
-                params = json.loads(row['parameters'])
-                available_params.update(params.keys())
-
-            selected_param = st.selectbox(
-                "Select Parameter to View Trend",
-                sorted(list(available_params)),
-                format_func=lambda x: x.replace('_', ' ').title()
-            )
+            customer_series = get_store().customer_series(customer_id)
+            available_params = customer_series.keys()
 
-            if selected_param:
-                param_values = []
-                dates = []
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                selected_param = st.selectbox(
+                    "Select Parameter to View Trend",
+                    sorted(available_params),
+                    format_func=lambda x: x.replace('_', ' ').title()
+                )
+            with col2:
+                window = st.selectbox("Time Window", list(TREND_WINDOWS), key='trend_window')
 
-                for _, row in customer_data_sorted.sort_values('timestamp').iterrows():
-                    params = json.loads(row['parameters'])
-                    if selected_param in params and params[selected_param]['status'] == 'accepted':
-                        param_values.append(params[selected_param]['value'])
-                        dates.append(row['timestamp'])
+            if selected_param:
+                timestamps, values, accepted = customer_series[selected_param]
+                dates, param_values = window_series(timestamps[accepted], values[accepted], TREND_WINDOWS[window])
 
                 if len(param_values) > 1:
-                    fig = px.line(x=dates, y=param_values,
-                                  title=f"{selected_param.replace('_', ' ').title()} Trend",
-                                  labels={'x': 'Date',
-                                          'y': f"{selected_param} ({PARAMETER_RANGES[selected_param]['unit']})"})
+                    fig = trend_figure(selected_param, dates, param_values)
 
                     # Add acceptable range bands
-                    acceptable_min, acceptable_max = PARAMETER_RANGES[selected_param]['acceptable']
-                    fig.add_hrect(y0=acceptable_min, y1=acceptable_max,
-                                  fillcolor="green", opacity=0.2,
-                                  annotation_text="Acceptable Range")
+                    acceptable = parameter_info(selected_param).get('acceptable')
+                    if acceptable:
+                        fig.add_hrect(y0=acceptable[0], y1=acceptable[1],
+                                      fillcolor="green", opacity=0.2,
+                                      annotation_text="Acceptable Range")
 
                     st.plotly_chart(fig, use_container_width=True)
                 else:
@@ -621,17 +2557,17 @@ def customer_interface():
         # Export functionality
         st.subheader("Export Data")
         if st.button("📄 Export as PDF Report", use_container_width=True):
-            # Generate PDF report content
-            report_content = generate_pdf_report(customer_data, user_info['name'])
-
-            # Create download button
-            st.download_button(
-                label="Download PDF Report",
-                data=report_content,
-                file_name=f"lab_report_{customer_id}_{datetime.now().strftime('%Y%m%d')}.pdf",
-                mime="application/pdf"
+            # Render in the background; the job is reused until this customer's data changes
+            store = get_store()
+            st.session_state.report_job = get_report_jobs().submit(
+                ('customer', customer_id, get_change_feed().version('customer', customer_id)),
+                generate_pdf_report, customer_id, user_info['name'], store
             )
 
+        if 'report_job' in st.session_state:
+            report_download('report_job', "Download PDF Report",
+                            f"lab_report_{customer_id}_{datetime.now().strftime('%Y%m%d')}.pdf", "application/pdf")
+
         # Data table
         st.subheader("All Test Results")
         display_df = customer_data_sorted[['submission_id', 'test_type', 'timestamp', 'technician_name']].copy()
@@ -643,42 +2579,304 @@ def customer_interface():
         st.info("No test results available yet. Please contact your lab technician.")
 
 
-def generate_pdf_report(customer_data, customer_name):
-    """Generate PDF report content (simplified - in real implementation, use reportlab)"""
-    report_text = f"""
-LAB MANAGEMENT SYSTEM
-Test Results Report
-
-Customer: {customer_name}
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-Total Tests: {len(customer_data)}
-
-RECENT TEST RESULTS:
-"""
+REPORT_CHUNK_ROWS = 200
+REPORT_CHART_POINTS = 300
+REPORT_SPOOL_BYTES = 4 * 1024 * 1024
+
+
+def _report_trend_drawing(param, info, timestamps, values, width, height):
+    """Vector trend chart with the acceptable range shaded, for embedding in the PDF"""
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.shapes import Drawing, Rect, String
+    from reportlab.lib import colors
+
+    timestamps, values = downsample_series(timestamps, values, REPORT_CHART_POINTS)
+    days = timestamps.astype('datetime64[s]').astype('int64') / 86400.0
+    acceptable = info.get('acceptable')
+    y_min = min(values.min(), acceptable[0]) if acceptable else values.min()
+    y_max = max(values.max(), acceptable[1]) if acceptable else values.max()
+    y_pad = (y_max - y_min) * 0.1 or 1.0
+    y_min, y_max = y_min - y_pad, y_max + y_pad
+    x_min, x_max = days[0], days[-1] if days[-1] > days[0] else days[0] + 1
+
+    plot = LinePlot()
+    plot.x, plot.y, plot.width, plot.height = 45, 20, width - 55, height - 40
+    plot.data = [list(zip(days.tolist(), values.tolist()))]
+    plot.lines[0].strokeColor = colors.HexColor('#1f77b4')
+    plot.xValueAxis.valueMin, plot.xValueAxis.valueMax = x_min, x_max
+    plot.xValueAxis.labelTextFormat = lambda v: (datetime(1970, 1, 1) + timedelta(days=v)).strftime('%Y-%m-%d')
+    plot.xValueAxis.labels.fontSize = 7
+    plot.yValueAxis.valueMin, plot.yValueAxis.valueMax = y_min, y_max
+    plot.yValueAxis.labels.fontSize = 7
+
+    scale = plot.height / (y_max - y_min)
+    drawing = Drawing(width, height)
+    if acceptable:
+        drawing.add(Rect(plot.x, plot.y + (acceptable[0] - y_min) * scale, plot.width,
+                         (acceptable[1] - acceptable[0]) * scale,
+                         fillColor=colors.Color(0, 0.5, 0, alpha=0.15), strokeColor=None))
+    drawing.add(plot)
+    drawing.add(String(plot.x, height - 12,
+                       f"{param.replace('_', ' ').title()} Trend ({info['unit']})",
+                       fontName='Helvetica-Bold', fontSize=10))
+    return drawing
+
+
+@profiled('generate_pdf_report')
+def generate_pdf_report(customer_id, customer_name, store=None):
+    """Render a customer's full accepted history as a PDF and return its bytes"""
+    import tempfile
+    from reportlab.graphics import renderPDF
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    store = store or get_store()
+    page_width, page_height = A4
+    margin = 40
+    row_height = 14
+    table_columns = [('Test #', 0), ('Date', 50), ('Test Type', 140), ('Technician', 215),
+                     ('Parameter', 310), ('Value', 410), ('Unit', 460)]
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    with tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES) as buffer:
+        pdf = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+        pdf.setTitle(f"Test Results Report - {customer_name}")
+        page_number = 1
+        y = page_height - margin
+
+        def new_page():
+            nonlocal page_number, y
+            pdf.setFont('Helvetica', 8)
+            pdf.drawRightString(page_width - margin, margin / 2, f"{customer_name} - page {page_number}")
+            pdf.showPage()
+            page_number += 1
+            y = page_height - margin
+
+        def table_header():
+            nonlocal y
+            pdf.setFont('Helvetica-Bold', 9)
+            for label, x in table_columns:
+                pdf.drawString(margin + x, y, label)
+            y -= 4
+            pdf.line(margin, y, page_width - margin, y)
+            y -= row_height - 4
+
+        pdf.setFont('Helvetica-Bold', 16)
+        pdf.drawString(margin, y, "LAB MANAGEMENT SYSTEM")
+        y -= 20
+        pdf.setFont('Helvetica', 11)
+        for line in ("Test Results Report", f"Customer: {customer_name}", f"Generated: {generated}",
+                     f"Total Tests: {store.count(customer_id=customer_id, status='accepted')}"):
+            pdf.drawString(margin, y, line)
+            y -= 15
+
+        # Trend charts
+        chart_width, chart_height = page_width - 2 * margin, 150
+        for param, (timestamps, values, accepted) in store.customer_series(customer_id).items():
+            if accepted.sum() < 2:
+                continue
+            if y - chart_height < margin:
+                new_page()
+            y -= chart_height + 10
+            renderPDF.draw(_report_trend_drawing(param, parameter_info(param, store), timestamps[accepted],
+                                                 values[accepted], chart_width, chart_height), pdf, margin, y)
+
+        # Results table, one row per accepted reading
+        y -= 25
+        if y < margin + 3 * row_height:
+            new_page()
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.drawString(margin, y, "TEST RESULTS")
+        y -= 20
+        table_header()
+        for submissions, readings in store.iter_history(customer_id, chunk_size=REPORT_CHUNK_ROWS):
+            # Per-submission cells are formatted once per chunk, not once per reading
+            submission_cells = dict(zip(submissions['submission_id'], zip(
+                submissions['submission_id'].astype(str), submissions['timestamp'].dt.strftime('%Y-%m-%d %H:%M'),
+                submissions['test_type'], submissions['technician_name'].str.slice(0, 18))))
+            readings = readings[readings['status'] == 'accepted']
+            for submission_id, param, value in zip(readings['submission_id'], readings['param'], readings['value']):
+                if y < margin + row_height:
+                    new_page()
+                    table_header()
+                info = parameter_info(param, store)
+                acceptable = info.get('acceptable')
+                in_range = acceptable is None or acceptable[0] <= value <= acceptable[1]
+                pdf.setFont('Helvetica' if in_range else 'Helvetica-Oblique', 8)
+                cells = submission_cells[submission_id] + (
+                    param.replace('_', ' ').title(), f"{value:g}", info['unit'])
+                for (_, x), text in zip(table_columns, cells):
+                    pdf.drawString(margin + x, y, text)
+                y -= row_height
+
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(page_width - margin, margin / 2, f"{customer_name} - page {page_number}")
+        pdf.save()
+        buffer.seek(0)
+        return buffer.read()
+
+
+@profiled('generate_all_reports')
+def generate_all_reports(store):
+    """Zip of one PDF report per customer with accepted results"""
+    import tempfile
+
+    with tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES) as buffer:
+        # PDF pages are already compressed, so store them as-is
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for customer_id, customer_name in CUSTOMER_NAMES.items():
+                if store.count(customer_id=customer_id, status='accepted'):
+                    archive.writestr(f"lab_report_{customer_id}.pdf",
+                                     generate_pdf_report(customer_id, customer_name, store))
+        buffer.seek(0)
+        return buffer.read()
+
+
+# Background report jobs
+REPORT_WORKERS = 2
+REPORT_POLL_SECONDS = 2
+REPORT_CACHE_BYTES = 64 * 1024 * 1024
+REPORT_CACHE_SECONDS = 10 * 60
+
+
+class ReportJobs:
+    """Bounded background pool rendering reports, sharing each result until its data changes or it is evicted"""
+
+    def __init__(self, max_workers=REPORT_WORKERS, max_bytes=REPORT_CACHE_BYTES, max_age=REPORT_CACHE_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report')
+        self._jobs = OrderedDict()
+        self._finished_at = {}
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        """Drop expired results, then the least recently requested past the byte budget; call under the lock"""
+        now = time.monotonic()
+        sizes = {}
+        for key, future in list(self._jobs.items()):
+            if not future.done():
+                continue
+            finished_at = self._finished_at.setdefault(key, now)
+            if now - finished_at > self._max_age:
+                del self._jobs[key], self._finished_at[key]
+                continue
+            result = None if future.exception() is not None else future.result()
+            sizes[key] = len(result) if isinstance(result, bytes) else 0
+        total = sum(sizes.values())
+        for key in list(sizes)[:-1]:  # the most recently requested is kept even if alone over budget
+            if total <= self._max_bytes:
+                break
+            total -= sizes[key]
+            del self._jobs[key], self._finished_at[key]
+
+    def submit(self, key, fn, *args):
+        """Start fn(*args) under key unless an identical job is running or finished"""
+        with self._lock:
+            self._evict()
+            future = self._jobs.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._executor.submit(fn, *args)
+                self._jobs[key] = future
+                self._finished_at.pop(key, None)
+            self._jobs.move_to_end(key)
+        return key
+
+    def status(self, key):
+        """Return (state, result) with state 'running', 'done', 'failed' or 'missing'"""
+        with self._lock:
+            self._evict()
+            future = self._jobs.get(key)
+        if future is None:
+            return 'missing', None
+        if not future.done():
+            return 'running', None
+        if future.exception() is not None:
+            return 'failed', future.exception()
+        return 'done', future.result()
+
+
+@st.cache_resource
+def get_report_jobs():
+    """Report worker pool shared by every session"""
+    return ReportJobs()
+
+
+@st.fragment(run_every=REPORT_POLL_SECONDS)
+def await_job(job_key, message):
+    """Show message while a job runs and rerun the page once when it ends"""
+    if get_report_jobs().status(job_key)[0] == 'running':
+        st.info(message)
+    else:
+        st.rerun()
 
-    for _, row in customer_data.head(10).iterrows():
-        report_text += f"""
-Test #{row['submission_id']} - {row['test_type']}
-Date: {row['timestamp'].strftime('%Y-%m-%d %H:%M')}
-Technician: {row['technician_name']}
 
-Parameters:
-"""
-        params = json.loads(row['parameters'])
-        for param, details in params.items():
-            if details['status'] == 'accepted':
-                param_label = param.replace('_', ' ').title()
-                unit = PARAMETER_RANGES[param]['unit']
-                report_text += f"  {param_label}: {details['value']} {unit}\n"
+def forget_job(session_key):
+    """Stop showing a job's outcome in this session"""
+    st.session_state.pop(session_key, None)
 
-        report_text += "\n"
 
-    return report_text.encode('utf-8')
+def report_download(session_key, label, file_name, mime):
+    """Offer the download of the finished report job in st.session_state[session_key], then forget it"""
+    job_key = st.session_state[session_key]
+    state, result = get_report_jobs().status(job_key)
+    if state == 'done':
+        st.download_button(label=label, data=result, file_name=file_name, mime=mime, use_container_width=True,
+                           on_click=forget_job, args=(session_key,))
+    elif state == 'failed':
+        st.error(f"❌ Report generation failed: {result}")
+    elif state == 'running':
+        await_job(job_key, "⏳ Generating report...")
+    else:
+        st.info("The report expired; export it again")
+        forget_job(session_key)
+
+
+def revalidation_status(session_key):
+    """Report the outcome of the re-validation job in st.session_state[session_key]"""
+    job_key = st.session_state[session_key]
+    state, result = get_report_jobs().status(job_key)
+    if state == 'done':
+        st.success(f"✅ Re-validated {result[0]} submission(s); {result[1]} changed status")
+    elif state == 'failed':
+        st.error(f"❌ Re-validation failed: {result}")
+    elif state == 'running':
+        await_job(job_key, "⏳ Re-validating history against the current catalog...")
+    else:
+        forget_job(session_key)
 
 
+@profiled_rerun
 def main():
     """Main application logic"""
     initialize_session_state()
+    add_pwa_config()
+    try:
+        get_store().record_catalog(CATALOG)
+    except CatalogVersionError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    get_change_feed().poll()
+
+    authenticator = get_authenticator()
+    # Tokens travel in a cookie; strip the token links of earlier releases
+    if 'session' in st.query_params:
+        del st.query_params['session']
+
+    # Resume a reconnecting browser from its session cookie
+    cookie = st.context.cookies.get(SESSION_COOKIE)
+    if not st.session_state.logged_in and cookie and cookie != st.session_state.get('rejected_session'):
+        username = authenticator.resume(cookie)
+        if username:
+            start_session(username, cookie)
+        else:
+            st.session_state.rejected_session = cookie
+            set_session_cookie('', 0)
+
+    # End sessions logged out elsewhere, expired, or whose user was removed from the registry
+    if st.session_state.logged_in and not authenticator.resume(st.session_state.session_token):
+        end_session()
+    write_session_cookie()
 
     # Logout button in sidebar
     if st.session_state.logged_in:
@@ -687,15 +2885,16 @@ def main():
             st.write(f"Role: **{st.session_state.user_role}**")
 
             if st.button("Logout", use_container_width=True):
-                for key in list(st.session_state.keys()):
-                    del st.session_state[key]
+                authenticator.revoke(st.session_state.session_token)
+                end_session()
                 st.rerun()
 
-            # Add some sample data for demo
-            if st.button("Load Sample Data", use_container_width=True):
-                load_sample_data()
-                st.success("Sample data loaded!")
-                st.rerun()
+            # Add some sample data for demo, only on a development deployment with an empty store
+            if SAMPLE_DATA_ENABLED and get_store().count() == 0:
+                if st.button("Load Sample Data", use_container_width=True):
+                    if load_sample_data():
+                        st.rerun()
+                    st.warning("The store already has submissions; sample data was not loaded")
 
     # Route to appropriate interface
     if not st.session_state.logged_in:
@@ -709,52 +2908,49 @@ def main():
 
 
 def load_sample_data():
-    """Load sample data for demonstration"""
+    """Add sample submissions to an empty shared store for demonstration; False if it had data"""
     sample_data = [
         {
-            'submission_id': 1,
             'technician_id': 'tech1',
             'technician_name': 'John Doe',
             'customer_id': 'CUST001',
             'customer_name': 'ABC Corp',
             'test_type': 'Basic Test',
-            'parameters': json.dumps({
+            'parameters': {
                 'soil_ph': {'value': 7.2, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'soil_ec': {'value': 1.5, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'water_ph': {'value': 7.8, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'water_ec': {'value': 0.8, 'status': 'accepted', 'reason': 'Value within acceptable range'}
-            }),
+            },
             'timestamp': datetime(2024, 1, 15, 10, 30),
             'status': 'accepted',
             'approval_notes': '',
             'approved_by': ''
         },
         {
-            'submission_id': 2,
             'technician_id': 'tech1',
             'technician_name': 'John Doe',
             'customer_id': 'CUST002',
             'customer_name': 'XYZ Ltd',
             'test_type': 'Basic Test',
-            'parameters': json.dumps({
+            'parameters': {
                 'soil_ph': {'value': 5.8, 'status': 'pending_approval', 'reason': 'Value requires manager approval'},
                 'soil_ec': {'value': 2.2, 'status': 'pending_approval', 'reason': 'Value requires manager approval'},
                 'water_ph': {'value': 7.0, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'water_ec': {'value': 1.2, 'status': 'accepted', 'reason': 'Value within acceptable range'}
-            }),
+            },
             'timestamp': datetime(2024, 1, 16, 14, 20),
             'status': 'pending_approval',
             'approval_notes': '',
             'approved_by': ''
         },
         {
-            'submission_id': 3,
             'technician_id': 'tech2',
             'technician_name': 'Jane Smith',
             'customer_id': 'CUST004',
             'customer_name': 'Green Energy',
             'test_type': 'Full Suite',
-            'parameters': json.dumps({
+            'parameters': {
                 'soil_ph': {'value': 6.8, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'soil_ec': {'value': 1.1, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'water_ph': {'value': 7.5, 'status': 'accepted', 'reason': 'Value within acceptable range'},
@@ -762,7 +2958,7 @@ def load_sample_data():
                 'nitrogen': {'value': 35, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'phosphorus': {'value': 45, 'status': 'accepted', 'reason': 'Value within acceptable range'},
                 'potassium': {'value': 250, 'status': 'accepted', 'reason': 'Value within acceptable range'}
-            }),
+            },
             'timestamp': datetime(2024, 1, 17, 9, 15),
             'status': 'accepted',
             'approval_notes': '',
@@ -770,7 +2966,13 @@ def load_sample_data():
         }
     ]
 
-    st.session_state.submissions_df = pd.DataFrame(sample_data)
+    store = get_store()
+    if store.count():
+        return False
+    for submission in sample_data:
+        readings = submission.pop('parameters')
+        store.add_submission(submission, readings)
+    return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,22 @@
+"""Helpers shared by the benchmark scripts."""
+import logging
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(db_path):
+    """Import InOa.py outside `streamlit run`, with its store at db_path.
+
+    The module must not have been imported yet, since the store path is read
+    at import time. Streamlit's per-call bare-mode warnings are silenced.
+    """
+    os.environ['LAB_DB_PATH'] = db_path
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    # Streamlit resets its log levels when it reads its config, so filter instead
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+        lambda record: record.levelno >= logging.ERROR)
+    import InOa
+    return InOa
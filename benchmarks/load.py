@@ -0,0 +1,392 @@
+"""Concurrent-session load test for InOa.py, driven headlessly through AppTest.
+
+Builds a throwaway deployment (users, customers and a seeded store in a
+temporary directory), then runs scripted role sessions against `main()`:
+technicians log in, submit samples and check their history; managers review
+and approve pending submissions, browse all submissions and export the
+customer reports; customers browse their trends and export a PDF. Every
+session waits an exponentially distributed think time between actions.
+
+AppTest swaps a process-wide runtime for each script run, so runs cannot
+overlap inside one process. Sessions are therefore spread over worker
+processes, each playing one server that serves its sessions one run at a
+time; resources cached with st.cache_resource are shared by a worker's
+sessions as they are in a real server. Reported per run:
+
+- latency percentiles per action (the script runs an action needs, not the
+  time it waited for its worker),
+- script runs per session, by role,
+- peak Python memory allocated during any one of a session's script runs
+  (tracemalloc; --no-trace-memory turns it off, it slows every run down),
+- peak RSS per worker process, and how far workers fell behind schedule.
+
+Everything runs offline on one machine:
+
+    python benchmarks/load.py --technicians 50 --managers 10 --customers 200 --duration 120
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import REPO_ROOT, load_app  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+APP_PATH = os.path.join(REPO_ROOT, 'InOa.py')
+PASSWORD = 'load-test'
+CUSTOMERS_PER_TECHNICIAN = 4
+PENDING_SHARE = 0.3  # of technician submissions with a reading in the approval range
+PERCENTILES = (50, 90, 95, 99)
+
+
+def write_deployment(directory, technicians, managers, customers, password_hash):
+    """Write users.json and customers.json for the load test and return their paths"""
+    customer_ids = [f"LC{i:04d}" for i in range(1, customers + 1)]
+    users = {}
+    for i in range(technicians):
+        assigned = [customer_ids[(i * CUSTOMERS_PER_TECHNICIAN + j) % customers]
+                    for j in range(CUSTOMERS_PER_TECHNICIAN)]
+        users[f"loadtech{i + 1:03d}"] = {'role': 'technician', 'name': f"Technician {i + 1}",
+                                         'customers': assigned, 'password_hash': password_hash}
+    for i in range(managers):
+        users[f"loadmgr{i + 1:03d}"] = {'role': 'manager', 'name': f"Manager {i + 1}",
+                                        'password_hash': password_hash}
+    for i, customer_id in enumerate(customer_ids):
+        users[f"loadcust{i + 1:03d}"] = {'role': 'customer', 'name': f"Customer {i + 1}",
+                                         'customer_id': customer_id, 'password_hash': password_hash}
+
+    users_path = os.path.join(directory, 'users.json')
+    customers_path = os.path.join(directory, 'customers.json')
+    with open(users_path, 'w', encoding='utf-8') as f:
+        json.dump(users, f)
+    with open(customers_path, 'w', encoding='utf-8') as f:
+        json.dump({customer_id: {'name': f"Customer {i + 1}"} for i, customer_id in enumerate(customer_ids)}, f)
+    return users_path, customers_path, users
+
+
+class Session:
+    """One scripted browser session; every step is a named action of one or more script runs"""
+
+    def __init__(self, username, info, catalog, rng, settings):
+        from streamlit.testing.v1 import AppTest
+        self.username = username
+        self.role = info['role']
+        self.info = info
+        self.catalog = catalog
+        self.rng = rng
+        self.settings = settings
+        self.at = AppTest.from_file(APP_PATH, default_timeout=settings['timeout'])
+        self.reruns = 0
+        self.peak_traced = 0
+        self.errors = 0
+        self.iteration = 0
+        self.logged_in = False
+
+    def run(self):
+        if self.settings['trace_memory']:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        self.reruns += 1
+        self.at.run()
+        if self.settings['trace_memory']:
+            self.peak_traced = max(self.peak_traced, tracemalloc.get_traced_memory()[1] - before)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def button(self, label):
+        for button in self.at.button:
+            if button.label == label:
+                return button
+        return None
+
+    def section(self, key, label):
+        self.at.radio(key=key).set_value(label)
+        self.run()
+
+    def next_action(self):
+        """(name, callable) for the session's next step"""
+        if not self.logged_in:
+            return 'login', self.login
+        self.iteration += 1
+        every = self.settings['export_every']
+        if self.role == 'technician':
+            return ('history', self.history) if self.iteration % 5 == 0 else ('submit', self.submit)
+        if self.role == 'manager':
+            if every and self.iteration % every == 0:
+                return 'export_all', self.export_all
+            return ('submissions', self.submissions) if self.iteration % 4 == 0 else ('approve', self.approve)
+        if every and self.iteration % every == 0:
+            return 'export_pdf', self.export_pdf
+        return 'trends', self.run
+
+    def login(self):
+        self.run()
+        self.at.text_input[0].input(self.username)
+        self.at.text_input[1].input(PASSWORD)
+        self.at.button[0].click()
+        self.run()
+        if not self.at.session_state['logged_in']:
+            raise RuntimeError('login failed')
+        self.logged_in = True
+
+    def submit(self):
+        self.section('technician_section', 'New Submission')
+        self.at.selectbox(key='customer_select').select(self.rng.choice(self.info['customers']))
+        self.run()
+        pending = self.rng.random() < PENDING_SHARE
+        for i, param in enumerate(self.catalog['basic_params']):
+            ranges = self.catalog['parameters'][param]
+            low, high = ranges['approval'] if pending and i == 0 else ranges['acceptable']
+            if pending and i == 0:
+                # Inside the approval range but outside the acceptable one
+                low = ranges['acceptable'][1] + (high - ranges['acceptable'][1]) * 0.1
+            self.at.number_input(key=f"param_{param}").set_value(round(self.rng.uniform(low, high), 2))
+        self.button('Submit Test Results').click()
+        self.run()
+
+    def history(self):
+        self.section('technician_section', 'Submission History')
+
+    def approve(self):
+        try:
+            self.at.radio(key='approval_view').set_value('Detailed')
+        except KeyError:
+            pass  # nothing pending
+        self.run()
+        approve = self.button('✅ Approve')
+        if approve is not None:
+            approve.click()
+            self.run()
+
+    def submissions(self):
+        self.section('manager_section', 'All Submissions')
+        self.section('manager_section', 'Approval Dashboard')
+
+    def wait_for_download(self, label):
+        """Rerun until the report job offers its download, as the polling fragment would"""
+        deadline = time.monotonic() + self.settings['timeout']
+        while time.monotonic() < deadline:
+            if any(d.label == label for d in self.at.get('download_button')):
+                return
+            time.sleep(self.settings['poll'])
+            self.run()
+        raise RuntimeError(f"'{label}' not offered within {self.settings['timeout']}s")
+
+    def export_all(self):
+        self.section('manager_section', 'All Submissions')
+        self.button('📄 Export All Customer Reports').click()
+        self.run()
+        self.wait_for_download('Download All Reports (ZIP)')
+        self.section('manager_section', 'Approval Dashboard')
+
+    def export_pdf(self):
+        self.button('📄 Export as PDF Report').click()
+        self.run()
+        self.wait_for_download('Download PDF Report')
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def worker(usernames, users, settings, seed):
+    """Play one server: serve usernames' sessions until the deadline and return raw measurements"""
+    import logging
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+        lambda record: record.levelno >= logging.ERROR)
+    with open(os.environ.get('LAB_CATALOG_PATH', os.path.join(REPO_ROOT, 'parameters.json'))) as f:
+        catalog = json.load(f)
+    rng = random.Random(seed)
+    if settings['trace_memory']:
+        tracemalloc.start()
+    baseline_rss = rss_mb()
+
+    started = time.monotonic()
+    deadline = started + settings['duration']
+    # Logins are spread over the ramp-up period
+    queue = [(started + rng.uniform(0, settings['ramp_up']), i) for i in range(len(usernames))]
+    heapq.heapify(queue)
+    sessions = [None] * len(usernames)
+    latencies, failures, lag = {}, {}, []
+
+    while queue:
+        due, i = heapq.heappop(queue)
+        now = time.monotonic()
+        if due >= deadline:
+            continue
+        if due > now:
+            time.sleep(due - now)
+        else:
+            lag.append(now - due)
+        if sessions[i] is None:
+            sessions[i] = Session(usernames[i], users[usernames[i]], catalog, random.Random(rng.random()), settings)
+        session = sessions[i]
+        name, action = session.next_action()
+        start = time.perf_counter()
+        try:
+            action()
+        except Exception as e:  # a failed action is a measurement, not a harness error
+            session.errors += 1
+            failures.setdefault(name, []).append(str(e)[:200])
+        else:
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+        heapq.heappush(queue, (time.monotonic() + rng.expovariate(1 / settings['think']), i))
+
+    return {
+        'latencies': latencies,
+        'failures': failures,
+        'lag': lag,
+        'baseline_rss_mb': baseline_rss,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'sessions': [{'username': s.username, 'role': s.role, 'reruns': s.reruns, 'errors': s.errors,
+                      'peak_traced_mb': s.peak_traced / 2 ** 20}
+                     for s in sessions if s is not None],
+    }
+
+
+def summarize(values):
+    values = np.asarray(values, dtype='float64')
+    if not len(values):
+        return None
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary.update(count=int(len(values)), max=float(values.max()), mean=float(values.mean()))
+    return summary
+
+
+def report(results, settings, elapsed):
+    latencies, failures = {}, {}
+    sessions, lag = [], []
+    for result in results:
+        for name, values in result['latencies'].items():
+            latencies.setdefault(name, []).extend(values)
+        for name, errors in result['failures'].items():
+            failures.setdefault(name, []).extend(errors)
+        sessions.extend(result['sessions'])
+        lag.extend(result['lag'])
+
+    roles = {}
+    for session in sessions:
+        roles.setdefault(session['role'], []).append(session)
+    return {
+        'started_at': settings['started_at'],
+        'settings': {k: v for k, v in settings.items() if k != 'started_at'},
+        'elapsed_seconds': elapsed,
+        'actions': {name: dict(summarize(latencies.get(name, [])) or {'count': 0},
+                               failures=len(failures.get(name, [])))
+                    for name in sorted(set(latencies) | set(failures))},
+        'failure_samples': {name: sorted(set(errors))[:5] for name, errors in failures.items()},
+        'roles': {role: {'sessions': len(group),
+                         'reruns': summarize([s['reruns'] for s in group]),
+                         'peak_traced_mb': summarize([s['peak_traced_mb'] for s in group])
+                         if settings['trace_memory'] else None}
+                  for role, group in sorted(roles.items())},
+        'workers': [{'baseline_rss_mb': r['baseline_rss_mb'], 'peak_rss_mb': r['peak_rss_mb'],
+                     'sessions': len(r['sessions'])} for r in results],
+        'schedule_lag': summarize(lag),
+        'sessions': sessions,
+    }
+
+
+def print_report(summary):
+    print(f"\n{'action':<14}{'count':>7}{'fail':>6}" + ''.join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+          + f"{'max':>10}   (ms)")
+    for name, stats in summary['actions'].items():
+        row = ''.join(f"{stats[f'p{p}'] * 1000:10.0f}" for p in PERCENTILES) + f"{stats['max'] * 1000:10.0f}" \
+            if stats['count'] else ''
+        print(f"{name:<14}{stats['count']:>7}{stats['failures']:>6}{row}")
+    for name, samples in summary['failure_samples'].items():
+        print(f"  {name} failed: {'; '.join(samples)}")
+
+    print(f"\n{'role':<12}{'sessions':>9}{'runs p50':>10}{'runs max':>10}{'mem p50':>10}{'mem max':>10}   (MB)")
+    for role, stats in summary['roles'].items():
+        memory = stats['peak_traced_mb']
+        print(f"{role:<12}{stats['sessions']:>9}{stats['reruns']['p50']:>10.0f}{stats['reruns']['max']:>10.0f}"
+              + (f"{memory['p50']:>10.1f}{memory['max']:>10.1f}" if memory else ''))
+
+    for i, worker_stats in enumerate(summary['workers']):
+        print(f"worker {i}: {worker_stats['sessions']} sessions, RSS {worker_stats['baseline_rss_mb']:.0f} MB "
+              f"at start, {worker_stats['peak_rss_mb']:.0f} MB peak")
+    lag = summary['schedule_lag']
+    if lag:
+        print(f"schedule lag: p50 {lag['p50']:.2f}s, p95 {lag['p95']:.2f}s, max {lag['max']:.2f}s "
+              "(workers saturated when this grows with the run)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--technicians', type=int, default=50)
+    parser.add_argument('--managers', type=int, default=10)
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='server processes')
+    parser.add_argument('--duration', type=float, default=120, help='seconds of load after the start')
+    parser.add_argument('--ramp-up', type=float, default=30, help='seconds over which sessions log in')
+    parser.add_argument('--think', type=float, default=5, help='mean seconds between a session\'s actions')
+    parser.add_argument('--export-every', type=int, default=10,
+                        help='every Nth manager/customer action is a report export (0 disables exports)')
+    parser.add_argument('--history', type=int, default=20000, help='synthetic submissions to seed the store with')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help='seconds before a script run counts as failed')
+    parser.add_argument('--no-trace-memory', dest='trace_memory', action='store_false')
+    parser.add_argument('--output', help='write the full results as JSON to this file')
+    parser.add_argument('--keep', action='store_true', help='keep the temporary deployment directory')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='inoa-load-')
+    os.environ['LAB_DB_PATH'] = os.path.join(directory, 'lab_data.db')
+    try:
+        # The app reads the registry paths at import, so write the files first and the hashes once it is loaded
+        users_path, customers_path, _ = write_deployment(
+            directory, args.technicians, args.managers, args.customers, password_hash='')
+        os.environ['LAB_USERS_PATH'] = users_path
+        os.environ['LAB_CUSTOMERS_PATH'] = customers_path
+        app = load_app(os.environ['LAB_DB_PATH'])
+        _, _, users = write_deployment(
+            directory, args.technicians, args.managers, args.customers, app.hash_password(PASSWORD))
+        if args.history:
+            print(f"seeding {args.history} submissions")
+            generate(app, app.get_store(), args.history, seed=args.seed)
+
+        settings = {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'technicians': args.technicians, 'managers': args.managers, 'customers': args.customers,
+            'workers': args.workers, 'duration': args.duration, 'ramp_up': args.ramp_up, 'think': args.think,
+            'export_every': args.export_every, 'history': args.history, 'timeout': args.timeout,
+            'trace_memory': args.trace_memory, 'poll': app.REPORT_POLL_SECONDS / 4,
+        }
+        # Interleave roles so every worker serves a similar mix
+        usernames = sorted(users, key=lambda u: (int(u[-3:]), u))
+        shards = [usernames[i::args.workers] for i in range(args.workers)]
+        print(f"running {len(usernames)} sessions on {args.workers} worker(s) for {args.duration:.0f}s")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(worker, shard, users, settings, args.seed + i)
+                       for i, shard in enumerate(shards) if shard]
+            results = [future.result() for future in futures]
+        summary = report(results, settings, time.perf_counter() - started)
+    finally:
+        if not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print_report(summary)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Startup benchmark for InOa.py.
+
+Reports the cold-start time of a fresh process (imports plus the first script
+run), the per-rerun overhead of the login page and each role's landing view,
+and which heavy optional modules the first run imported. Exits non-zero when a
+budget given on the command line is exceeded.
+
+    python benchmarks/startup.py --cold-runs 3 --reruns 20 --budget-cold 4 --budget-rerun 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'InOa.py')
+LAZY_MODULES = ['plotly.express', 'reportlab', 'openpyxl', 'pyarrow.parquet']
+ROLES = {'technician': ('tech1', 'pass123'), 'manager': ('manager1', 'mgr123'), 'customer': ('customer1', 'cust123')}
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'exception': bool(at.exception),
+                  'loaded': [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def cold_start(db_path):
+    """Time one fresh interpreter from launch to the first rendered login page"""
+    env = dict(os.environ, LAB_DB_PATH=db_path)
+    output = subprocess.run([sys.executable, '-c', COLD_START, APP_PATH] + LAZY_MODULES, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def rerun_times(reruns, role=None):
+    """Seconds per rerun of the login page, or of a role's view after logging in"""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    if role is not None:
+        username, password = ROLES[role]
+        at.text_input[0].input(username)
+        at.text_input[1].input(password)
+        at.button[0].click()
+        at.run()
+    if at.exception:
+        raise RuntimeError(f"{role or 'login'} view raised: {at.exception[0].message}")
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cold-runs', type=int, default=3, help='fresh processes to launch')
+    parser.add_argument('--reruns', type=int, default=20, help='reruns timed per view')
+    parser.add_argument('--budget-cold', type=float, help='maximum median cold start in seconds')
+    parser.add_argument('--budget-rerun', type=float, help='maximum median rerun in seconds')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        os.environ['LAB_DB_PATH'] = db_path
+
+        cold = [cold_start(db_path) for _ in range(args.cold_runs)]
+        cold_times = [run['seconds'] for run in cold]
+        cold_median = statistics.median(cold_times)
+        print(f"cold start       median {cold_median:7.3f}s  "
+              f"(runs: {', '.join(f'{t:.3f}' for t in cold_times)})")
+        print(f"first run loaded {', '.join(cold[-1]['loaded']) or 'no lazy modules'}")
+        if args.budget_cold is not None and cold_median > args.budget_cold:
+            failures.append(f"cold start {cold_median:.3f}s > {args.budget_cold}s")
+
+        for role in [None] + list(ROLES):
+            times = rerun_times(args.reruns, role)
+            median = statistics.median(times)
+            print(f"rerun {role or 'login':<10} median {median * 1000:7.1f}ms  max {max(times) * 1000:7.1f}ms")
+            if args.budget_rerun is not None and median > args.budget_rerun:
+                failures.append(f"{role or 'login'} rerun {median:.3f}s > {args.budget_rerun}s")
+
+    for failure in failures:
+        print(f"over budget: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
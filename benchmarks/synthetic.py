@@ -0,0 +1,127 @@
+"""Seeded synthetic data for the lab store.
+
+Generates submissions spread over the technicians and customers of the user
+registry, with readings drawn around each parameter's acceptable range of the
+current catalog. Most readings land inside the acceptable range and the rest
+inside the approval range, so every submission is one the app would have
+accepted or queued for approval. Older pending submissions are decided by a
+manager. The same seed, size and end date always produce the same data.
+
+    python benchmarks/synthetic.py lab_data.db --submissions 100000 --seed 7
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import load_app  # noqa: E402
+
+FULL_SUITE_SHARE = 0.2
+DECIDED_SHARE = 0.7  # of pending submissions older than DECISION_DAYS
+DECISION_DAYS = 3
+REJECTED_SHARE = 0.2  # of decided submissions
+
+
+def generate(app, store, submissions, seed=0, days=365, end=None, chunk_size=5000, progress=None):
+    """Insert `submissions` synthetic submissions into store and return how many were added"""
+    rng = np.random.default_rng(seed)
+    catalog = app.CATALOG
+    registry = app.REGISTRY
+    end = end or datetime.now().replace(microsecond=0)
+
+    technicians = sorted(t for t, customers in registry.customers_by_technician.items() if customers)
+    assigned = {t: sorted(registry.customers_by_technician[t]) for t in technicians}
+    managers = [registry.users[m]['name'] for m in registry.users_by_role.get('manager', [])] or ['Lab Manager']
+
+    params = catalog.full_suite_params
+    bounds = catalog.bounds
+    slots = np.array([bounds['index'][p] for p in params])
+    centre = (bounds['acceptable_min'][slots] + bounds['acceptable_max'][slots]) / 2
+    spread = (bounds['acceptable_max'][slots] - bounds['acceptable_min'][slots]) / 4
+    basic = np.isin(params, catalog.basic_params)
+
+    start = end - timedelta(days=days)
+    added = 0
+    while added < submissions:
+        n = min(chunk_size, submissions - added)
+        tech_idx = rng.integers(len(technicians), size=n)
+        customer_pick = rng.random(n)
+        full_suite = rng.random(n) < FULL_SUITE_SHARE
+        # Each chunk covers its share of the history, so submission ids follow time order
+        offsets = (added + np.sort(rng.random(n)) * n) / submissions * days * 86400
+        values = rng.normal(centre, spread, size=(n, len(params)))
+        values = np.clip(values, bounds['approval_min'][slots], bounds['approval_max'][slots])
+        values = np.round(np.maximum(values, 0.01), 2)
+        values[~full_suite[:, None] & ~basic[None, :]] = np.nan
+        cell_codes, row_codes = app.validate_batch(values, params, bounds)
+        decided = rng.random(n) < DECIDED_SHARE
+        rejected = rng.random(n) < REJECTED_SHARE
+        manager_idx = rng.integers(len(managers), size=n)
+
+        batch = []
+        for i in range(n):
+            technician = technicians[tech_idx[i]]
+            customers = assigned[technician]
+            customer_id = customers[int(customer_pick[i] * len(customers))]
+            timestamp = start + timedelta(seconds=int(offsets[i]))
+            status = app.READING_STATUSES[row_codes[i]]
+            approval_notes = approved_by = ''
+            if status == 'pending_approval' and decided[i] and end - timestamp > timedelta(days=DECISION_DAYS):
+                status = 'rejected' if rejected[i] else 'accepted'
+                approval_notes = 'Synthetic decision'
+                approved_by = managers[manager_idx[i]]
+            readings = {}
+            for j in np.flatnonzero(cell_codes[i] != app.STATUS_MISSING):
+                reading_status = app.READING_STATUSES[cell_codes[i, j]]
+                readings[params[j]] = {
+                    'value': values[i, j],
+                    'status': reading_status,
+                    'reason': app.ACCEPTED_REASON if reading_status == 'accepted' else app.PENDING_REASON,
+                }
+            batch.append(({
+                'technician_id': technician,
+                'technician_name': registry.users[technician]['name'],
+                'customer_id': customer_id,
+                'customer_name': registry.customer_names.get(customer_id, 'Unknown Customer'),
+                'test_type': 'Full Suite' if full_suite[i] else 'Basic Test',
+                'timestamp': timestamp,
+                'status': status,
+                'catalog_version': catalog.version,
+                'approval_notes': approval_notes,
+                'approved_by': approved_by,
+            }, readings))
+        store.add_submissions(batch)
+        added += n
+        if progress:
+            progress(added)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('db_path', help='SQLite file to fill (created if missing)')
+    parser.add_argument('--submissions', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=365, help='history length')
+    parser.add_argument('--end', type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
+                        help='date of the newest submission (default: now)')
+    args = parser.parse_args()
+
+    app = load_app(os.path.abspath(args.db_path))
+    started = time.perf_counter()
+
+    def progress(added):
+        rate = added / (time.perf_counter() - started)
+        print(f"\r{added}/{args.submissions} submissions ({rate:,.0f}/s)", end='', flush=True)
+
+    generate(app, app.get_store(), args.submissions, seed=args.seed, days=args.days, end=args.end,
+             progress=progress)
+    print()
+
+
+if __name__ == '__main__':
+    main()
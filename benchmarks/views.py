@@ -0,0 +1,212 @@
+"""Per-view benchmark suite for InOa.py at production-like data sizes.
+
+For each requested size a seeded synthetic store is generated (and kept
+under benchmarks/data/ for later runs). The suite then times what each view
+computes from the store, plus validation, trend building and report export.
+Results are written to benchmarks/results/ as JSON and compared with the
+previous results file, so a case that got slower shows up as a regression.
+
+    python benchmarks/views.py --sizes 10000 100000 --repeat 3
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import REPO_ROOT, load_app  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_END = datetime(2025, 1, 1)  # fixed so cached datasets stay identical between runs
+PAGE_SIZE = 25
+VALIDATION_CHUNK_ROWS = 100_000  # rows per validate_batch call, so the matrix stays small at any size
+
+
+def dataset(app, size, seed, data_dir):
+    """Path of the synthetic store for (size, seed), generating it on first use"""
+    path = os.path.join(data_dir, f"synthetic-{size}-seed{seed}.db")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"generating {size} submissions into {path}")
+        partial = path + '.partial'
+        for leftover in glob.glob(partial + '*'):
+            os.remove(leftover)
+        store = app.SubmissionStore(partial)
+        generate(app, store, size, seed=seed, end=DATA_END)
+        store._connect().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        store._connect().close()
+        os.replace(partial, path)
+    return path
+
+
+def busiest(store, column):
+    """Value of column with the most accepted submissions"""
+    return store._connect().execute(
+        f"SELECT {column} FROM submissions WHERE status = 'accepted' GROUP BY {column} "
+        "ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+
+
+def cases(app, store, reports):
+    """Benchmark name -> zero-argument callable"""
+    technician = busiest(store, 'technician_id')
+    customer = busiest(store, 'customer_id')
+
+    def technician_history():
+        store.count(technician_id=technician)
+        page = store.query(technician_id=technician, limit=PAGE_SIZE, offset=0, newest_first=True)
+        store.readings(submission_ids=page['submission_id'])
+
+    def approval_dashboard():
+        store.count(status='pending_approval')
+        app.pending_labels(store.query(status='pending_approval'))
+        page = store.query(status='pending_approval', limit=PAGE_SIZE, offset=0)
+        readings = store.readings(submission_ids=page['submission_id'])
+        readings[readings['status'] == 'pending_approval']
+
+    def bulk_tolerance():
+        readings = store.readings(submission_status='pending_approval')
+        app.pending_deviation(readings[readings['status'] == 'pending_approval'])
+
+    def manager_overview():
+        store.status_counts()
+        store.daily_counts()
+        store.query(limit=PAGE_SIZE, offset=0, newest_first=True)
+
+    def customer_portal():
+        customer_data = store.query(customer_id=customer, status='accepted')
+        recent = customer_data.sort_values('timestamp', ascending=False).head(5)
+        store.readings(submission_ids=recent['submission_id'])
+
+    def trend_build():
+        store._series_cache.clear()
+        for param, (timestamps, values, accepted) in store.customer_series(customer).items():
+            app.downsample_series(*app.window_series(timestamps[accepted], values[accepted], None))
+
+    def customer_health():
+        store.count(customer_id=customer, status='accepted')
+        store.query(customer_id=customer, status='accepted', limit=10, newest_first=True)
+
+    def change_feed():
+        # A replica catching up on the longest backlog it replays rather than resetting
+        feed = app.ChangeFeed(store)
+        feed.position = max(0, feed.position - app.FEED_RESET_EVENTS)
+        feed.poll()
+
+    # One chunk of readings is validated repeatedly to cover a row per stored submission
+    rows = store.count()
+    matrix = np.random.default_rng(0).uniform(
+        0, 2 * app.PARAMETER_BOUNDS['approval_max'],
+        size=(min(rows, VALIDATION_CHUNK_ROWS), len(app.FULL_SUITE_PARAMS))
+    )
+
+    def validation():
+        for start in range(0, rows, VALIDATION_CHUNK_ROWS):
+            app.validate_batch(matrix[:rows - start], app.FULL_SUITE_PARAMS)
+
+    benchmarks = {
+        'technician_history': technician_history,
+        'approval_dashboard': approval_dashboard,
+        'bulk_tolerance': bulk_tolerance,
+        'manager_overview': manager_overview,
+        'customer_portal': customer_portal,
+        'trend_build': trend_build,
+        'customer_health': customer_health,
+        'change_feed': change_feed,
+        'validation': validation,
+    }
+    if reports:
+        benchmarks['report_export'] = lambda: app.generate_pdf_report(customer, customer, store)
+    return benchmarks
+
+
+def time_case(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'min': min(times)}
+
+
+def previous_results(results_dir):
+    files = sorted(glob.glob(os.path.join(results_dir, 'views-*.json')))
+    if not files:
+        return None, None
+    with open(files[-1]) as f:
+        return files[-1], json.load(f)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000], help='submissions per dataset')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case (median is reported)')
+    parser.add_argument('--skip-reports', action='store_true', help='leave out the PDF export case')
+    parser.add_argument('--data-dir', default=os.path.join(BENCH_DIR, 'data'))
+    parser.add_argument('--results-dir', default=os.path.join(BENCH_DIR, 'results'))
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown against the previous results reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    app = load_app(os.path.join(args.data_dir, 'unused.db'))
+
+    results = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'sizes': {},
+    }
+    for size in args.sizes:
+        store = app.SubmissionStore(dataset(app, size, args.seed, args.data_dir))
+        results['sizes'][str(size)] = sized = {}
+        for name, fn in cases(app, store, not args.skip_reports).items():
+            sized[name] = time_case(fn, args.repeat)
+            print(f"{size:>10} {name:<20} median {sized[name]['median'] * 1000:10.1f}ms  "
+                  f"min {sized[name]['min'] * 1000:10.1f}ms")
+
+    previous_path, previous = previous_results(args.results_dir)
+    regressions = []
+    if previous:
+        for size, sized in results['sizes'].items():
+            for name, timing in sized.items():
+                before = previous['sizes'].get(size, {}).get(name)
+                if before and timing['median'] > before['median'] * (1 + args.threshold):
+                    regressions.append(f"{size} {name}: {before['median'] * 1000:.1f}ms -> "
+                                       f"{timing['median'] * 1000:.1f}ms")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"views-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {path}")
+    if previous_path:
+        print(f"compared with {previous_path}: {len(regressions)} regression(s)")
+    for regression in regressions:
+        print(f"regression: {regression}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+// Service worker for the Lab Management System.
+//
+// Registered from InOa.py as sw.js?v=<asset version>; the version names the
+// cache, so a deploy with new assets starts a fresh cache and drops the old.
+const CACHE = 'lab-shell-' + new URL(self.location).searchParams.get('v');
+const SCOPE = new URL(self.registration.scope);
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(caches.open(CACHE).then((cache) => cache.add(SCOPE.href)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((keys) => Promise.all(keys.filter((key) => key.startsWith('lab-shell-') && key !== CACHE)
+                                            .map((key) => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+// Content-hashed files never change under the same URL: Streamlit's frontend
+// bundle under static/ and our own assets requested with ?v=
+function isImmutable(url) {
+    const path = url.pathname.slice(SCOPE.pathname.length);
+    return path.startsWith('static/') || (path.startsWith('pwa/') && url.searchParams.has('v'));
+}
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== SCOPE.origin) {
+        return;
+    }
+
+    if (request.mode === 'navigate') {
+        // App shell: network first so deploys show up, cached copy when offline
+        event.respondWith(
+            fetch(request)
+                .then((response) => {
+                    if (response.ok) {
+                        const copy = response.clone();
+                        caches.open(CACHE).then((cache) => cache.put(SCOPE.href, copy));
+                    }
+                    return response;
+                })
+                .catch(() => caches.match(SCOPE.href))
+        );
+    } else if (isImmutable(url)) {
+        event.respondWith(
+            caches.match(request).then((cached) => cached || fetch(request).then((response) => {
+                if (response.ok) {
+                    const copy = response.clone();
+                    caches.open(CACHE).then((cache) => cache.put(request, copy));
+                }
+                return response;
+            }))
+        );
+    }
+    // Everything else (websocket, health checks, uploads, media) goes to the network untouched
+});
@@ -0,0 +1,39 @@
+"""Shared fixtures: InOa.py imported outside `streamlit run` with throwaway stores."""
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The default store path is read at import time; keep it away from lab_data.db
+os.environ['LAB_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='lab-tests-'), 'lab_data.db')
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+# Streamlit resets its log levels when it reads its config, so filter instead
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+    lambda record: record.levelno >= logging.ERROR)
+
+import InOa  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    return InOa.SubmissionStore(str(tmp_path / 'lab.db'))
+
+
+@pytest.fixture
+def submit(store):
+    """Insert a submission and return (submission_id, version)"""
+    def submit(technician_id='tech1', customer_id='CUST001', status='accepted', value=7.0):
+        submission = {
+            'technician_id': technician_id, 'technician_name': technician_id.title(),
+            'customer_id': customer_id, 'customer_name': customer_id.title(),
+            'test_type': 'Basic Test', 'timestamp': datetime(2024, 1, 15, 10, 30), 'status': status,
+        }
+        readings = {'soil_ph': {'value': value, 'status': status, 'reason': ''}}
+        return store.add_submission(submission, readings), 1
+    return submit
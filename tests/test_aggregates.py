@@ -0,0 +1,80 @@
+"""Submission counts kept by triggers, checked against the submissions themselves."""
+from datetime import datetime
+
+import pandas as pd
+
+import InOa
+
+
+def add(store, technician_id, customer_id, status, day):
+    submission = {
+        'technician_id': technician_id, 'technician_name': technician_id, 'customer_id': customer_id,
+        'customer_name': customer_id, 'test_type': 'Basic Test', 'timestamp': datetime(2024, 1, day, 9),
+        'status': status,
+    }
+    return store.add_submission(submission, {'soil_ph': {'value': 7.0, 'status': status, 'reason': ''}})
+
+
+def recount(store, **filters):
+    """status_counts computed from the submissions table"""
+    return store.query(**filters)['status'].value_counts().to_dict()
+
+
+def aggregate_rows(store):
+    return store._connect().execute('SELECT COUNT(*) FROM submission_counts').fetchone()[0]
+
+
+def test_counts_follow_inserts(store):
+    add(store, 'tech1', 'CUST001', 'accepted', 1)
+    add(store, 'tech1', 'CUST001', 'accepted', 1)
+    add(store, 'tech1', 'CUST002', 'pending_approval', 2)
+    add(store, 'tech2', 'CUST001', 'rejected', 2)
+
+    assert store.status_counts() == {'accepted': 2, 'pending_approval': 1, 'rejected': 1}
+    for filters in ({'technician_id': 'tech1'}, {'customer_id': 'CUST001'}, {'status': 'accepted'}):
+        assert store.status_counts(**filters) == recount(store, **filters)
+
+
+def test_counts_follow_decisions_and_drop_empty_groups(store):
+    pending = add(store, 'tech1', 'CUST001', 'pending_approval', 1)
+    other = add(store, 'tech1', 'CUST002', 'pending_approval', 1)
+    store.update_status(pending, 1, 'accepted', '', 'Manager')
+    store.update_statuses({other: 1}, 'rejected', '', 'Manager')
+
+    assert store.status_counts() == {'accepted': 1, 'rejected': 1}
+    assert store.status_counts(status='pending_approval') == {}
+    assert aggregate_rows(store) == 2
+
+
+def test_a_decision_leaves_other_groups_alone(store):
+    first = add(store, 'tech1', 'CUST001', 'pending_approval', 1)
+    add(store, 'tech1', 'CUST001', 'pending_approval', 1)
+    add(store, 'tech2', 'CUST002', 'accepted', 3)
+    store.update_status(first, 1, 'accepted', '', 'Manager')
+
+    assert store.status_counts(technician_id='tech1') == {'accepted': 1, 'pending_approval': 1}
+    assert store.status_counts(technician_id='tech2') == {'accepted': 1}
+    assert aggregate_rows(store) == 3
+
+
+def test_daily_counts_pivot_by_day_and_status(store):
+    add(store, 'tech1', 'CUST001', 'accepted', 1)
+    add(store, 'tech1', 'CUST001', 'pending_approval', 1)
+    decided = add(store, 'tech1', 'CUST001', 'pending_approval', 2)
+    store.update_status(decided, 1, 'rejected', '', 'Manager')
+
+    daily = store.daily_counts()
+    assert list(daily.index) == [pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-02')]
+    assert daily.to_dict('index') == {
+        pd.Timestamp('2024-01-01'): {'accepted': 1, 'pending_approval': 1, 'rejected': 0},
+        pd.Timestamp('2024-01-02'): {'accepted': 0, 'pending_approval': 0, 'rejected': 1},
+    }
+    assert store.daily_counts(customer_id='CUST002').empty
+
+
+def test_counts_are_rebuilt_for_an_existing_store(store):
+    add(store, 'tech1', 'CUST001', 'accepted', 1)
+    add(store, 'tech1', 'CUST001', 'pending_approval', 2)
+    store._connect().execute('DROP TABLE submission_counts')
+
+    assert InOa.SubmissionStore(store.path).status_counts() == {'accepted': 1, 'pending_approval': 1}
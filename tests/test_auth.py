@@ -0,0 +1,75 @@
+"""Session tokens: signatures, expiry and logouts shared through the store."""
+import time
+from types import SimpleNamespace
+
+import InOa
+
+SECRET = b'test-secret'
+
+
+class StaticRegistry:
+    def __init__(self, *usernames):
+        self.users = {name: {'role': 'technician'} for name in usernames}
+
+    def snapshot(self):
+        return SimpleNamespace(users=self.users)
+
+
+def authenticator(store, **kwargs):
+    return InOa.Authenticator(StaticRegistry('tech1'), store, SECRET, max_workers=1, **kwargs)
+
+
+def test_issued_token_resumes_on_another_replica(store):
+    token = authenticator(store).issue_token('tech1')
+
+    assert authenticator(InOa.SubmissionStore(store.path)).resume(token) == 'tech1'
+
+
+def test_forged_and_malformed_tokens_are_refused(store):
+    token = authenticator(store).issue_token('tech1')
+    other = InOa.Authenticator(StaticRegistry('tech1'), store, b'other-secret', max_workers=1)
+
+    assert other.resume(token) is None
+    forged = token[:-1] + ('0' if token[-1] != '0' else '1')
+    assert authenticator(store).resume(forged) is None
+    assert authenticator(store).resume('not-a-token') is None
+
+
+def test_expired_tokens_and_removed_users_are_refused(store):
+    expired = authenticator(store, token_ttl=-1).issue_token('tech1')
+    auth = authenticator(store)
+    token = auth.issue_token('tech1')
+    auth._registry.users.clear()
+
+    assert authenticator(store).resume(expired) is None
+    assert auth.resume(token) is None
+
+
+def test_logout_on_one_replica_ends_the_session_everywhere(store):
+    first, second = authenticator(store), authenticator(InOa.SubmissionStore(store.path))
+    token = first.issue_token('tech1')
+    other_session = first.issue_token('tech1')
+    assert second.resume(token) == 'tech1'
+
+    first.revoke(token)
+
+    assert second.resume(token) is None
+    assert authenticator(store).resume(token) is None  # after a restart
+    assert second.resume(other_session) == 'tech1'
+
+
+def test_lapsed_revocations_are_pruned(store):
+    store.revoke_session('old', time.time() - 1)
+    store.revoke_session('current', time.time() + 60)
+
+    assert not store.session_revoked('old')
+    assert store.session_revoked('current')
+
+
+def test_token_cache_is_bounded(store):
+    auth = authenticator(store, cache_entries=3)
+    tokens = [auth.issue_token('tech1') for _ in range(5)]
+
+    assert len(auth._tokens) == 3
+    assert all(auth.resume(token) == 'tech1' for token in tokens)
+    assert len(auth._tokens) == 3
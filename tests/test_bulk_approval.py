@@ -0,0 +1,33 @@
+"""Tolerance scoring behind the manager's bulk selection."""
+import pandas as pd
+import pytest
+
+import InOa
+
+
+def readings(*rows):
+    return pd.DataFrame(rows, columns=['submission_id', 'param', 'value'])
+
+
+def test_deviation_is_the_worst_relative_distance_outside_the_range(store):
+    deviation = InOa.pending_deviation(readings(
+        (1, 'soil_ph', 7.0), (1, 'soil_ec', 2.2),   # soil_ec acceptable up to 2.0
+        (2, 'soil_ph', 5.7),                        # soil_ph acceptable from 6.0
+    ), store)
+
+    assert deviation.to_dict() == pytest.approx({1: 0.1, 2: 0.05})
+
+
+def test_removed_parameters_use_their_recorded_range(store):
+    ranges = {'lead': {'acceptable': [1, 10], 'approval': [0, 20], 'unit': 'mg/kg'}}
+    store.record_catalog(InOa.CatalogVersion(version=0, ranges=ranges, basic_params=[], full_suite_params=[],
+                                             bounds=InOa.compile_parameter_ranges(ranges)))
+    deviation = InOa.pending_deviation(readings((1, 'lead', 11.0), (2, 'lead', 5.0)), store)
+
+    assert deviation.to_dict() == pytest.approx({1: 0.1, 2: 0.0})
+
+
+def test_readings_without_a_known_range_are_left_out(store):
+    deviation = InOa.pending_deviation(readings((1, 'soil_ph', 6.6), (1, 'mystery', 1e6), (2, 'mystery', 1.0)), store)
+
+    assert deviation.to_dict() == {1: 0.0}
@@ -0,0 +1,85 @@
+"""Row checks applied to bulk uploads before anything is stored."""
+import pandas as pd
+import pytest
+
+import InOa
+
+BASIC = {'soil_ph': 7.0, 'soil_ec': 1.0, 'water_ph': 7.0, 'water_ec': 1.0}
+FULL = {param: (sum(InOa.PARAMETER_RANGES[param]['acceptable']) / 2) for param in InOa.FULL_SUITE_PARAMS}
+
+
+def prepare(rows, assigned=('CUST001',), first_row=1):
+    return InOa.prepare_bulk_chunk(pd.DataFrame(rows), first_row, 'tech1', 'Tech One', frozenset(assigned))
+
+
+def test_valid_rows_become_submissions():
+    batch, rejects = prepare([dict(BASIC, customer_id='CUST001', timestamp='2024-03-01 09:30')])
+
+    assert rejects == []
+    (submission, readings), = batch
+    assert submission['technician_id'] == 'tech1' and submission['customer_id'] == 'CUST001'
+    assert submission['status'] == 'accepted' and submission['catalog_version'] == InOa.CATALOG.version
+    assert str(submission['timestamp']) == '2024-03-01 09:30:00'
+    assert {param: r['value'] for param, r in readings.items()} == BASIC
+
+
+def test_customers_not_assigned_to_the_technician_are_refused():
+    _, rejects = prepare([dict(BASIC, customer_id='CUST001'), dict(BASIC, customer_id=' CUST002 ')], first_row=11)
+
+    assert rejects == [{'row': 12, 'customer_id': 'CUST002', 'reason': 'Customer ID not assigned to you or invalid'}]
+
+
+def test_missing_and_non_positive_values_are_refused():
+    batch, rejects = prepare([
+        {'customer_id': 'CUST001', 'soil_ph': 7.0, 'soil_ec': 1.0, 'water_ph': 7.0},
+        dict(BASIC, customer_id='CUST001', soil_ec=0),
+        dict(BASIC, customer_id='CUST001', water_ec='n/a'),
+    ])
+
+    assert batch == []
+    assert [r['reason'] for r in rejects] == ['Missing values: water_ec', 'Missing values: soil_ec',
+                                              'Missing values: water_ec']
+
+
+def test_test_type_is_inferred_from_the_parameters_present():
+    batch, rejects = prepare([dict(BASIC, customer_id='CUST001'), dict(FULL, customer_id='CUST001')])
+
+    assert rejects == []
+    assert [s['test_type'] for s, _ in batch] == ['Basic Test', 'Full Suite']
+    assert [len(r) for _, r in batch] == [len(InOa.BASIC_PARAMS), len(InOa.FULL_SUITE_PARAMS)]
+
+
+def test_explicit_test_type_sets_the_required_parameters():
+    batch, rejects = prepare([
+        dict(BASIC, customer_id='CUST001', test_type='Full Suite'),
+        dict(FULL, customer_id='CUST001', test_type='Basic Test'),
+        dict(BASIC, customer_id='CUST001', test_type='Soil Only'),
+    ])
+
+    assert rejects[0]['reason'].startswith('Missing values: ')
+    assert rejects[1:] == [{'row': 3, 'customer_id': 'CUST001', 'reason': 'Unknown test type: Soil Only'}]
+    (submission, readings), = batch
+    assert submission['test_type'] == 'Basic Test' and sorted(readings) == sorted(InOa.BASIC_PARAMS)
+
+
+def test_out_of_range_values_reject_the_row_with_each_reason():
+    batch, rejects = prepare([
+        dict(BASIC, customer_id='CUST001', soil_ph=9.5, water_ec=2.5),
+        dict(BASIC, customer_id='CUST001', soil_ec=2.5),
+    ])
+
+    assert rejects[0]['reason'] == '; '.join([
+        f"soil_ph: {InOa.validate_parameter('soil_ph', 9.5)[1]}",
+        f"water_ec: {InOa.validate_parameter('water_ec', 2.5)[1]}",
+    ])
+    (submission, readings), = batch
+    assert submission['status'] == 'pending_approval'
+    assert readings['soil_ec'] == {'value': 2.5, 'status': 'pending_approval', 'reason': InOa.PENDING_REASON}
+
+
+def test_headers_are_normalised_and_customer_id_is_required():
+    batch, _ = prepare([{'Customer ID': 'CUST001', 'Soil PH': 7.0, 'soil_ec': 1.0, 'Water pH': 7.0, 'water_ec': 1.0}])
+    assert len(batch) == 1
+
+    with pytest.raises(ValueError, match='customer_id'):
+        prepare([BASIC])
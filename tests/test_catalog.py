@@ -0,0 +1,124 @@
+"""Catalog versions and re-validation of history against a new catalog."""
+import json
+from datetime import datetime
+
+import pytest
+
+import InOa
+
+REPO_CATALOG = InOa.CATALOG_PATH
+
+
+def write_catalog(path, version, drop=(), **acceptable):
+    """Copy of the shipped catalog with a version, dropped parameters and changed acceptable ranges"""
+    with open(REPO_CATALOG, encoding='utf-8') as f:
+        catalog = json.load(f)
+    catalog['version'] = version
+    for param in drop:
+        del catalog['parameters'][param]
+    for param, bounds in acceptable.items():
+        catalog['parameters'][param]['acceptable'] = list(bounds)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f)
+    return path
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    return str(tmp_path / 'parameters.json')
+
+
+def add(store, values, catalog, approved_by=''):
+    """Store a submission validated against catalog and return (submission_id, status)"""
+    readings, status, _ = InOa.validate_readings(values, catalog.ranges)
+    submission = {
+        'technician_id': 'tech1', 'technician_name': 'Tech1', 'customer_id': 'CUST001',
+        'customer_name': 'Cust001', 'test_type': 'Full Suite', 'timestamp': datetime(2024, 1, 15),
+        'status': status, 'approved_by': approved_by, 'catalog_version': catalog.version,
+    }
+    return store.add_submission(submission, readings), status
+
+
+def statuses(store):
+    return dict(zip(store.query()['submission_id'], store.query()['status']))
+
+
+def test_revalidation_reclassifies_undecided_submissions(store, catalog_file):
+    old = InOa.ParameterCatalog(write_catalog(catalog_file, 1)).snapshot()
+    accepted, _ = add(store, {'soil_ph': 7.2, 'soil_ec': 1.0}, old)
+    new = InOa.ParameterCatalog(write_catalog(catalog_file, 2, soil_ph=(6.0, 7.0))).snapshot()
+
+    assert store.revalidate(new) == (1, 1)
+    assert statuses(store) == {accepted: 'pending_approval'}
+    reading = store.readings(submission_ids=[accepted]).set_index('param').loc['soil_ph']
+    assert (reading['status'], reading['reason']) == ('pending_approval', InOa.PENDING_REASON)
+    assert store.count_outdated(new.version) == 0
+
+
+def test_revalidation_keeps_manager_decisions(store, catalog_file):
+    old = InOa.ParameterCatalog(write_catalog(catalog_file, 1)).snapshot()
+    decided, status = add(store, {'soil_ph': 5.8}, old)
+    assert status == 'pending_approval'
+    store.update_status(decided, 1, 'rejected', 'resample', 'Manager')
+    new = InOa.ParameterCatalog(write_catalog(catalog_file, 2, soil_ph=(5.6, 6.0))).snapshot()
+
+    assert store.revalidate(new) == (1, 0)
+    assert statuses(store) == {decided: 'rejected'}
+    assert store.readings(submission_ids=[decided])['status'].tolist() == ['accepted']
+
+
+def test_revalidation_skips_submissions_already_on_the_catalog(store, catalog_file):
+    old = InOa.ParameterCatalog(write_catalog(catalog_file, 1)).snapshot()
+    new = InOa.ParameterCatalog(write_catalog(catalog_file, 2, soil_ph=(6.0, 7.0))).snapshot()
+    outdated, _ = add(store, {'soil_ph': 7.2}, old)
+    current, _ = add(store, {'soil_ph': 7.2}, new)
+    readings, status, _ = InOa.validate_readings({'soil_ph': 7.5}, new.ranges)
+    store.resubmit(outdated, 1, 'tech1', status, readings, new.version)
+    versions = dict(zip(store.query()['submission_id'], store.query()['version']))
+
+    assert store.revalidate(new) == (0, 0)
+    assert dict(zip(store.query()['submission_id'], store.query()['version'])) == versions
+    assert statuses(store) == {outdated: 'pending_approval', current: 'pending_approval'}
+
+
+def test_revalidation_ignores_readings_of_removed_parameters(store, catalog_file):
+    old = InOa.ParameterCatalog(write_catalog(catalog_file, 1)).snapshot()
+    submission_id, status = add(store, {'soil_ph': 7.0, 'bulk_density': 1.2}, old)
+    only_removed, _ = add(store, {'bulk_density': 1.7}, old)
+    new = InOa.ParameterCatalog(write_catalog(catalog_file, 2, drop=['bulk_density'])).snapshot()
+
+    assert status == 'accepted'
+    assert store.revalidate(new) == (2, 0)
+    assert statuses(store) == {submission_id: 'accepted', only_removed: 'pending_approval'}
+    removed = store.readings(submission_ids=[submission_id]).set_index('param').loc['bulk_density']
+    assert (removed['status'], removed['reason']) == ('accepted', InOa.ACCEPTED_REASON)
+
+
+def reload(catalog):
+    """Snapshot after forcing the next change check"""
+    catalog._checked_at = float('-inf')
+    catalog._mtimes = None
+    return catalog.snapshot()
+
+
+def test_reload_refuses_changed_ranges_under_the_same_version(catalog_file, caplog):
+    catalog = InOa.ParameterCatalog(write_catalog(catalog_file, 1))
+    write_catalog(catalog_file, 1, soil_ph=(6.0, 7.0))
+
+    assert reload(catalog).ranges['soil_ph']['acceptable'] == (6.0, 8.0)
+    assert 'kept version 1' in caplog.text
+    write_catalog(catalog_file, 2, soil_ph=(6.0, 7.0))
+    assert reload(catalog).ranges['soil_ph']['acceptable'] == (6.0, 7.0)
+
+
+def test_record_catalog_refuses_other_ranges_for_a_recorded_version(store, catalog_file):
+    original = InOa.ParameterCatalog(write_catalog(catalog_file, 1)).snapshot()
+    edited = InOa.ParameterCatalog(write_catalog(catalog_file, 1, soil_ph=(6.0, 7.0))).snapshot()
+    store.record_catalog(original)
+    store.record_catalog(original)
+
+    with pytest.raises(InOa.CatalogVersionError):
+        store.record_catalog(edited)
+    with pytest.raises(InOa.CatalogVersionError):
+        InOa.SubmissionStore(store.path).record_catalog(edited)  # after a restart
+    assert store.catalog_ranges(1)['soil_ph']['acceptable'] == [6.0, 8.0]
@@ -0,0 +1,203 @@
+"""Submission event feed, view invalidation and compare-and-set writes."""
+from datetime import datetime
+
+import pytest
+
+import InOa
+
+
+def readings(status, value=7.0):
+    return {'soil_ph': {'value': value, 'status': status, 'reason': ''}}
+
+
+def test_events_are_logged_in_change_order(store, submit):
+    first, version = submit(status='pending_approval')
+    second, _ = submit(technician_id='tech2', customer_id='CUST002')
+    store.update_status(first, version, 'accepted', '', 'Manager')
+
+    events = store.events_since(0)
+    assert [e.seq for e in events] == sorted(e.seq for e in events)
+    assert [(e.submission_id, e.old_status, e.new_status) for e in events] == [
+        (first, None, 'pending_approval'),
+        (second, None, 'accepted'),
+        (first, 'pending_approval', 'accepted'),
+    ]
+    assert events[1].technician_id == 'tech2' and events[1].customer_id == 'CUST002'
+    assert store.latest_event() == events[-1].seq
+
+
+def test_events_since_is_an_exclusive_cursor(store, submit):
+    for _ in range(5):
+        submit()
+    events = store.events_since(0)
+
+    assert store.events_since(events[1].seq) == events[2:]
+    assert store.events_since(events[1].seq, limit=2) == events[2:4]
+    assert store.events_since(store.latest_event()) == []
+
+
+def test_failed_write_logs_no_event(store, submit):
+    submission_id, version = submit(status='pending_approval')
+    store.update_status(submission_id, version, 'accepted', '', 'Manager')
+    latest = store.latest_event()
+
+    with pytest.raises(InOa.StaleSubmissionError):
+        store.update_status(submission_id, version, 'rejected', '', 'Other Manager')
+    assert store.latest_event() == latest
+
+
+def test_feed_bumps_only_the_scopes_an_event_touches(store, submit):
+    feed = InOa.ChangeFeed(store)
+    submit(technician_id='tech2', customer_id='CUST002', status='pending_approval')
+    feed.poll()
+
+    assert feed.version('all') == (0, 1)
+    assert feed.version('technician', 'tech2') == (0, 1)
+    assert feed.version('customer', 'CUST002') == (0, 1)
+    assert feed.version('status', 'pending_approval') == (0, 1)
+    assert feed.version('technician', 'tech1') == (0, 0)
+    assert feed.version('status', 'accepted') == (0, 0)
+
+
+def test_feed_follows_writes_from_other_connections(store):
+    feed = InOa.ChangeFeed(store)
+    other_replica = InOa.SubmissionStore(store.path)
+    other_replica.add_submission({
+        'technician_id': 'tech1', 'technician_name': 'Tech1', 'customer_id': 'CUST001',
+        'customer_name': 'Cust001', 'test_type': 'Basic Test', 'timestamp': datetime(2024, 1, 15),
+        'status': 'accepted'}, readings('accepted'))
+
+    assert feed.poll() == store.latest_event()
+    assert feed.version('technician', 'tech1') == (0, 1)
+
+
+def test_feed_resets_when_the_store_is_replaced(store, submit, tmp_path):
+    submit()
+    submit()
+    feed = InOa.ChangeFeed(store)
+    feed._store = InOa.SubmissionStore(str(tmp_path / 'empty.db'))
+    feed.poll()
+
+    assert feed.position == 0
+    assert feed.version('all') == (1, 0)
+
+
+def test_view_cache_rebuilds_only_invalidated_scopes(store, submit):
+    feed = InOa.ChangeFeed(store)
+    cache = InOa.ViewModelCache()
+    builds = []
+
+    def view(technician_id):
+        return cache.get(('history', technician_id), feed.version('technician', technician_id),
+                         lambda: builds.append(technician_id) or technician_id)
+
+    view('tech1'), view('tech2')
+    submit(technician_id='tech2')
+    feed.poll()
+    view('tech1'), view('tech2')
+
+    assert builds == ['tech1', 'tech2', 'tech2']
+
+
+def test_decision_invalidates_both_status_scopes(store, submit):
+    submission_id, version = submit(status='pending_approval')
+    feed = InOa.ChangeFeed(store)
+    pending, accepted = feed.version('status', 'pending_approval'), feed.version('status', 'accepted')
+    store.update_status(submission_id, version, 'accepted', '', 'Manager')
+    feed.poll()
+
+    assert feed.version('status', 'pending_approval') != pending
+    assert feed.version('status', 'accepted') != accepted
+
+
+def test_view_cache_keeps_the_most_recently_used_entries():
+    cache = InOa.ViewModelCache(max_entries=2)
+    cache.get('a', 1, lambda: 'a')
+    cache.get('b', 1, lambda: 'b')
+    cache.get('a', 1, lambda: 'rebuilt')
+    cache.get('c', 1, lambda: 'c')
+
+    assert cache.get('a', 1, lambda: 'rebuilt') == 'a'
+    assert cache.get('b', 1, lambda: 'rebuilt') == 'rebuilt'
+
+
+def test_update_status_conflict_keeps_the_first_decision(store, submit):
+    submission_id, version = submit(status='pending_approval')
+    assert store.update_status(submission_id, version, 'accepted', 'ok', 'Manager') == version + 1
+
+    with pytest.raises(InOa.StaleSubmissionError, match='now accepted by Manager'):
+        store.update_status(submission_id, version, 'rejected', 'no', 'Other Manager')
+    row = store.query().iloc[0]
+    assert (row['status'], row['approved_by'], row['version']) == ('accepted', 'Manager', version + 1)
+
+
+def test_update_status_only_decides_pending_submissions(store, submit):
+    submission_id, version = submit(status='rejected')
+
+    with pytest.raises(InOa.StaleSubmissionError):
+        store.update_status(submission_id, version, 'accepted', '', 'Manager')
+
+
+def test_update_statuses_skips_stale_submissions(store, submit):
+    first, version = submit(status='pending_approval')
+    second, _ = submit(status='pending_approval')
+    store.update_status(second, version, 'rejected', '', 'Manager')
+
+    updated = store.update_statuses({first: version, second: version}, 'accepted', '', 'Other Manager')
+    statuses = dict(zip(store.query()['submission_id'], store.query()['status']))
+    assert statuses == {first: 'accepted', second: 'rejected'}
+    assert updated == 1
+
+
+def test_resubmit_conflicts_with_a_decision(store, submit):
+    submission_id, version = submit(status='pending_approval')
+    store.update_status(submission_id, version, 'rejected', '', 'Manager')
+
+    with pytest.raises(InOa.StaleSubmissionError, match='now rejected'):
+        store.resubmit(submission_id, version, 'tech1', 'accepted', readings('accepted', 6.5), 1)
+    assert store.readings(submission_ids=[submission_id])['value'].tolist() == [7.0]
+
+
+def test_resubmit_replaces_readings_and_clears_the_decision(store, submit):
+    submission_id, version = submit(status='pending_approval')
+    version = store.update_status(submission_id, version, 'rejected', 'too acidic', 'Manager')
+
+    assert store.resubmit(submission_id, version, 'tech1', 'accepted', readings('accepted', 6.5), 1) == version + 1
+    row = store.query().iloc[0]
+    assert (row['status'], row['approved_by'], row['approval_notes']) == ('accepted', '', '')
+    assert store.readings(submission_ids=[submission_id])['value'].tolist() == [6.5]
+
+
+def test_resubmit_is_limited_to_the_submitting_technician(store, submit):
+    submission_id, version = submit()
+
+    with pytest.raises(InOa.StaleSubmissionError):
+        store.resubmit(submission_id, version, 'tech2', 'accepted', readings('accepted'), 1)
+
+
+def client_entry(client_id, fingerprint, value=7.0):
+    submission = {
+        'technician_id': 'tech1', 'technician_name': 'Tech1', 'customer_id': 'CUST001',
+        'customer_name': 'Cust001', 'test_type': 'Basic Test', 'timestamp': datetime(2024, 1, 15),
+        'status': 'accepted'}
+    return client_id, fingerprint, submission, readings('accepted', value)
+
+
+def test_client_submission_replay_is_idempotent(store):
+    created = store.add_client_submissions([client_entry('a', 'fa'), client_entry('b', 'fb')])
+    assert {k: outcome for k, (_, outcome) in created.items()} == {'a': 'created', 'b': 'created'}
+
+    replayed = store.add_client_submissions([client_entry('a', 'fa'), client_entry('b', 'changed', 8.0),
+                                             client_entry('c', 'fc')])
+    assert replayed['a'] == (created['a'][0], 'duplicate')
+    assert replayed['b'] == (created['b'][0], 'conflict')
+    assert replayed['c'][1] == 'created'
+    assert store.count() == 3
+    assert sorted(store.readings()['value'].tolist()) == [7.0, 7.0, 7.0]
+
+
+def test_client_submission_repeated_within_a_batch_is_stored_once(store):
+    results = store.add_client_submissions([client_entry('a', 'fa'), client_entry('a', 'fa')])
+
+    assert results['a'][1] == 'created'
+    assert store.count() == 1
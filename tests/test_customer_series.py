@@ -0,0 +1,59 @@
+"""Per-customer trend series cached under customer_version."""
+from datetime import datetime
+
+import InOa
+
+
+def add(store, customer_id, status, value, day=1):
+    submission = {
+        'technician_id': 'tech1', 'technician_name': 'Tech1', 'customer_id': customer_id,
+        'customer_name': customer_id, 'test_type': 'Basic Test', 'timestamp': datetime(2024, 1, day, 9),
+        'status': status,
+    }
+    return store.add_submission(submission, {'soil_ph': {'value': value, 'status': status, 'reason': ''}})
+
+
+def test_series_hold_accepted_submissions_in_time_order(store):
+    add(store, 'CUST001', 'accepted', 7.2, day=2)
+    add(store, 'CUST001', 'accepted', 6.8, day=1)
+    add(store, 'CUST001', 'pending_approval', 5.8, day=3)
+    add(store, 'CUST002', 'accepted', 7.5)
+
+    series = store.customer_series('CUST001')['soil_ph']
+    assert series.values.tolist() == [6.8, 7.2]
+    assert series.accepted.tolist() == [True, True]
+    assert list(series.timestamps) == sorted(series.timestamps)
+
+
+def test_series_are_served_from_cache_until_the_customer_changes(store):
+    add(store, 'CUST001', 'accepted', 7.0)
+    first = store.customer_series('CUST001')
+
+    add(store, 'CUST002', 'accepted', 7.5)
+    add(store, 'CUST001', 'pending_approval', 5.8)
+    assert store.customer_series('CUST001') is first
+
+    add(store, 'CUST001', 'accepted', 6.5, day=2)
+    assert store.customer_series('CUST001')['soil_ph'].values.tolist() == [7.0, 6.5]
+
+
+def test_decisions_and_edits_change_the_customer_version(store):
+    pending = add(store, 'CUST001', 'pending_approval', 5.8)
+    before = store.customer_version('CUST001')
+    store.update_status(pending, 1, 'accepted', '', 'Manager')
+    approved = store.customer_version('CUST001')
+
+    assert approved != before
+    assert store.customer_series('CUST001')['soil_ph'].values.tolist() == [5.8]
+
+    store.resubmit(pending, 2, 'tech1', 'accepted', {'soil_ph': {'value': 6.5, 'status': 'accepted', 'reason': ''}}, 1)
+    assert store.customer_version('CUST001') != approved
+    assert store.customer_series('CUST001')['soil_ph'].values.tolist() == [6.5]
+
+
+def test_series_follow_writes_from_another_replica(store):
+    add(store, 'CUST001', 'accepted', 7.0)
+    store.customer_series('CUST001')
+    add(InOa.SubmissionStore(store.path), 'CUST001', 'accepted', 6.5, day=2)
+
+    assert store.customer_series('CUST001')['soil_ph'].values.tolist() == [7.0, 6.5]
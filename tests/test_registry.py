@@ -0,0 +1,28 @@
+"""Registry indexes built from users.json and customers.json."""
+import json
+
+import InOa
+
+
+def registry(tmp_path, users, customers=None):
+    users_path, customers_path = tmp_path / 'users.json', tmp_path / 'customers.json'
+    users_path.write_text(json.dumps(users))
+    customers_path.write_text(json.dumps(customers or {'CUST001': {'name': 'ABC Corp'}}))
+    return InOa.Registry(str(users_path), str(customers_path)).snapshot()
+
+
+def test_technician_customers_are_sorted_and_deduplicated(tmp_path):
+    snapshot = registry(tmp_path, {
+        'tech1': {'role': 'technician', 'customers': ['CUST003', 'CUST001', 'CUST003']},
+        'manager1': {'role': 'manager'},
+    })
+
+    assert snapshot.technician_customers == {'tech1': ('CUST001', 'CUST003')}
+    assert snapshot.customers_by_technician == {'tech1': frozenset({'CUST001', 'CUST003'})}
+
+
+def test_technicians_without_customers_get_empty_assignments(tmp_path):
+    snapshot = registry(tmp_path, {'tech1': {'role': 'technician'}})
+
+    assert snapshot.technician_customers == {'tech1': ()}
+    assert snapshot.customers_by_technician == {'tech1': frozenset()}
@@ -0,0 +1,36 @@
+"""Eviction of finished background report results."""
+import time
+
+import InOa
+
+
+def wait(jobs, key):
+    while jobs.status(key)[0] == 'running':
+        time.sleep(0.01)
+    return jobs.status(key)
+
+
+def test_results_past_the_byte_budget_are_evicted_oldest_first():
+    jobs = InOa.ReportJobs(max_workers=1, max_bytes=10)
+    jobs.submit('first', bytes, 8)
+    wait(jobs, 'first')
+    jobs.submit('second', bytes, 8)
+
+    assert wait(jobs, 'second') == ('done', bytes(8))
+    assert jobs.status('first') == ('missing', None)
+
+
+def test_a_result_over_budget_on_its_own_is_still_served():
+    jobs = InOa.ReportJobs(max_workers=1, max_bytes=10)
+    jobs.submit('large', bytes, 20)
+
+    assert wait(jobs, 'large') == ('done', bytes(20))
+
+
+def test_results_expire():
+    jobs = InOa.ReportJobs(max_workers=1, max_age=0.05)
+    jobs.submit('report', bytes, 1)
+    wait(jobs, 'report')
+    time.sleep(0.1)
+
+    assert jobs.status('report') == ('missing', None)
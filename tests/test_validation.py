@@ -0,0 +1,95 @@
+"""validate_batch must agree with the scalar validate_parameter/validate_readings rules."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import InOa
+
+
+def edge_values(ranges):
+    """Both sides of every range edge, the edges themselves and points in between"""
+    (acceptable_min, acceptable_max), (approval_min, approval_max) = ranges['acceptable'], ranges['approval']
+    edges = [approval_min, acceptable_min, acceptable_max, approval_max]
+    values = [0.0, -1.0, (approval_min + acceptable_min) / 2, (acceptable_min + acceptable_max) / 2,
+              (acceptable_max + approval_max) / 2, approval_max * 10]
+    for edge in edges:
+        values += [np.nextafter(edge, -np.inf), float(edge), np.nextafter(edge, np.inf)]
+    return values
+
+
+def scalar_code(param, value, ranges=None):
+    return InOa.STATUS_CODES[InOa.validate_parameter(param, value, ranges)[0]]
+
+
+@pytest.mark.parametrize('param', sorted(InOa.PARAMETER_RANGES))
+def test_cells_match_validate_parameter_at_range_edges(param):
+    values = edge_values(InOa.PARAMETER_RANGES[param])
+    cell_codes, row_codes = InOa.validate_batch(pd.DataFrame({param: values}))
+
+    assert cell_codes[:, 0].tolist() == [scalar_code(param, v) for v in values]
+    assert row_codes.tolist() == cell_codes[:, 0].tolist()
+
+
+def test_unknown_parameters_are_rejected_like_validate_parameter():
+    cell_codes, _ = InOa.validate_batch(pd.DataFrame({'soil_ph': [7.0], 'mystery': [1.0]}))
+
+    assert cell_codes.tolist() == [[scalar_code('soil_ph', 7.0), scalar_code('mystery', 1.0)]]
+    assert InOa.validate_parameter('mystery', 1.0)[0] == 'rejected'
+
+
+@pytest.mark.parametrize('readings, overall', [
+    ({'soil_ph': 7.0, 'soil_ec': 1.0}, 'accepted'),
+    ({'soil_ph': 6.0, 'soil_ec': 2.0}, 'accepted'),
+    ({'soil_ph': 7.0, 'soil_ec': 2.5}, 'pending_approval'),
+    ({'soil_ph': 5.5, 'soil_ec': 3.0}, 'pending_approval'),
+    ({'soil_ph': 5.4, 'soil_ec': 1.0}, 'rejected'),
+    ({'soil_ph': 8.6, 'soil_ec': 2.5}, 'rejected'),
+    ({'soil_ph': 5.4, 'soil_ec': 3.1}, 'rejected'),
+])
+def test_row_status_matches_validate_readings(readings, overall):
+    _, row_codes = InOa.validate_batch(pd.DataFrame([readings]))
+
+    assert InOa.validate_readings(readings)[1] == overall
+    assert row_codes.tolist() == [InOa.STATUS_CODES[overall]]
+
+
+def test_missing_cells_are_ignored_in_the_row_status():
+    values = pd.DataFrame({'soil_ph': [np.nan, 5.4, np.nan], 'soil_ec': [2.5, np.nan, np.nan]})
+    cell_codes, row_codes = InOa.validate_batch(values)
+
+    assert (cell_codes[[0, 1, 2], [0, 1, 0]] == InOa.STATUS_MISSING).all()
+    assert row_codes.tolist() == [InOa.STATUS_CODES['pending_approval'], InOa.STATUS_CODES['rejected'],
+                                  InOa.STATUS_MISSING]
+
+
+def test_random_rows_match_validate_readings():
+    rng = np.random.default_rng(0)
+    params = InOa.FULL_SUITE_PARAMS
+    # Draw around and on the range edges so every status and boundary is hit
+    edges = np.array([[InOa.PARAMETER_RANGES[p]['approval'][0], InOa.PARAMETER_RANGES[p]['acceptable'][0],
+                       InOa.PARAMETER_RANGES[p]['acceptable'][1], InOa.PARAMETER_RANGES[p]['approval'][1]]
+                      for p in params], dtype='float64')
+    picks = edges[np.arange(len(params)), rng.integers(0, 4, size=(500, len(params)))]
+    values = np.where(rng.random(picks.shape) < 0.5, picks, picks * rng.uniform(0.9, 1.1, picks.shape))
+    cell_codes, row_codes = InOa.validate_batch(values, params)
+
+    for row, cells, row_code in zip(values, cell_codes, row_codes):
+        readings, overall, _ = InOa.validate_readings(dict(zip(params, row.tolist())))
+        assert cells.tolist() == [InOa.STATUS_CODES[readings[p]['status']] for p in params]
+        assert row_code == InOa.STATUS_CODES[overall]
+
+
+def test_compiled_custom_ranges_match_validate_parameter():
+    ranges = {'lead': {'acceptable': (0.0, 0.5), 'approval': (0.0, 1.0), 'unit': 'mg/kg'}}
+    values = edge_values(ranges['lead'])
+    cell_codes, _ = InOa.validate_batch(pd.DataFrame({'lead': values}), bounds=InOa.compile_parameter_ranges(ranges))
+
+    assert cell_codes[:, 0].tolist() == [scalar_code('lead', v, ranges) for v in values]
+
+
+def test_validate_readings_uses_the_given_ranges():
+    ranges = {'soil_ph': {'acceptable': (7.5, 8.0), 'approval': (7.0, 8.5), 'unit': 'pH'}}
+
+    assert InOa.validate_readings({'soil_ph': 7.2})[1] == 'accepted'
+    assert InOa.validate_readings({'soil_ph': 7.2}, ranges)[1] == 'pending_approval'
+    assert InOa.validate_readings({'soil_ph': 6.9}, ranges)[2] == ['soil_ph: Value outside acceptable range (7.0-8.5 pH)']